@@ -0,0 +1,254 @@
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import sudoku_cache
+import sudoku_corpus
+import sudoku_io
+from sudoku_core import (
+    BACKENDS,
+    DIFFICULTIES,
+    PROPAGATION_LEVELS,
+    RESULT_ABORTED,
+    RESULT_INVALID,
+    SEARCH_ENGINES,
+    VALUE_ORDERINGS,
+    VARIABLE_ORDERINGS,
+    SudokuSolver,
+    generate_unique_puzzle,
+    puzzle_string,
+)
+
+# Batch solving without any GUI. Puzzles travel as one-line strings (81 characters for 9x9,
+# 256 / 625 for 16x16 / 25x25, with 0 or . for blanks) and come back as one-line solutions,
+# or "invalid" / "unsolvable" / "timeout". With a count option each puzzle instead comes back
+# as its number of solutions, capped at the count, so count=2 gives 1 for unique puzzles.
+
+INVALID = "invalid"
+UNSOLVABLE = "unsolvable"
+TIMEOUT = "timeout"  # Hit the per-puzzle timeout or node budget
+LIMIT_OPTIONS = ("timeout", "max_nodes")  # Passed to solve() rather than to the constructor
+BATCH_OPTIONS = LIMIT_OPTIONS + ("count", "cache", "cache_file", "vector")  # Not SudokuSolver options at all
+GENERATE_BOXES = (3, 4)  # --generate sizes; generate_unique_puzzle takes minutes per 25x25 puzzle
+
+
+def solve_line(line, options):
+    limits = {name: options[name] for name in LIMIT_OPTIONS if options.get(name) is not None}
+    count = options.get("count")
+    cache = options.get("cache")
+    cache_file = options.get("cache_file")
+    options = {name: value for name, value in options.items() if name not in BATCH_OPTIONS}
+    if count is not None:
+        found = SudokuSolver(line, verbose=False, trace="off", **options).count_solutions(count, **limits)
+        return TIMEOUT if found is None else str(found)
+    if cache:
+        # Every worker process keeps its own cache, warmed from cache_file when one is given
+        solution, code = sudoku_cache.process_cache(cache, cache_file).solve(line, verbose=False, trace="off", **limits, **options)
+    else:
+        solution, code = SudokuSolver(line, verbose=False, trace="off", **options).solve(**limits)
+    if solution:
+        return solution
+    if code == RESULT_ABORTED:
+        return TIMEOUT
+    return INVALID if code == RESULT_INVALID else UNSOLVABLE
+
+
+def solve_chunk(lines, options):
+    # Unit of work sent to a worker process. With the vector option the whole chunk is first
+    # validated and filled with singles as NumPy arrays, and only the puzzles that leaves open
+    # go through solve_line one by one. NumPy is imported only here, so workers and servers
+    # that never vectorise do not pay for loading it
+    if not options.get("vector"):
+        return [solve_line(line, options) for line in lines]
+    import sudoku_vector
+    count = options.get("count")
+    results = []
+    for line, (state, solution) in zip(lines, sudoku_vector.presolve(lines)):
+        if state == sudoku_vector.GRID_OPEN:
+            results.append(solve_line(line, options))
+        elif count is not None:
+            results.append("1" if state == sudoku_vector.GRID_SOLVED else "0")  # Singles are forced, so a solution is unique
+        elif state == sudoku_vector.GRID_SOLVED:
+            results.append(solution)
+        else:
+            results.append(INVALID if state == sudoku_vector.GRID_INVALID else UNSOLVABLE)
+    return results
+
+
+def chunked(puzzles, chunk_size):
+    chunk = []
+    for line in puzzles:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_chunks(function, tasks, workers):
+    # function(*task) for every task across a process pool, yielding the items of each result
+    # in task order. Only a bounded window of tasks is in flight, so tasks are consumed lazily.
+    if workers == 1:
+        for task in tasks:
+            yield from function(*task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(function, *task))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def solve_batch(puzzles, workers=None, chunk_size=256, **options):
+    # Solve an iterable of puzzle strings across a process pool, yielding results in input
+    # order
+    workers = workers or os.cpu_count() or 1
+    yield from run_chunks(solve_chunk, ((chunk, options) for chunk in chunked(puzzles, chunk_size)), workers)
+
+
+def solve_range(path, start, stop, options):
+    # Unit of work for a binary corpus: the worker reads records start..stop-1 from its own
+    # (usually inherited) mapping, so no puzzle text crosses the process boundary
+    corpus = sudoku_corpus.shared_corpus(path)
+    if options.get("vector"):  # The NumPy path parses strings in bulk
+        return solve_chunk([corpus[index] for index in range(start, stop)], options)
+    return solve_chunk(list(corpus.records(start, stop)), options)
+
+
+def solve_corpus(path, workers=None, chunk_size=256, **options):
+    # solve_batch for a corpus file written by sudoku_corpus.write_corpus. The parent opens
+    # the corpus before the pool forks, so the workers share its mapping
+    workers = workers or os.cpu_count() or 1
+    total = len(sudoku_corpus.shared_corpus(path))
+    tasks = ((path, start, min(start + chunk_size, total), options) for start in range(0, total, chunk_size))
+    yield from run_chunks(solve_range, tasks, workers)
+
+
+def generate_one(task):
+    difficulty, seed, box = task
+    return puzzle_string(generate_unique_puzzle(difficulty, random.Random(seed), box=box))
+
+
+def generate_puzzles(count, difficulty=3, workers=None, seed=None, box=3):
+    # Generate count uniquely solvable puzzles in parallel, e.g. to pre-fill a puzzle pool.
+    # Every puzzle gets its own seed, so a fixed seed gives the same puzzles for any worker count
+    base = random.randrange(2 ** 32) if seed is None else seed
+    tasks = [(difficulty, base + index, box) for index in range(count)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(generate_one, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(generate_one, tasks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a file of one-line Sudoku puzzles.")
+    parser.add_argument("input", nargs="?", default="-", help="puzzle file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", help="write solutions here instead of stdout")
+    parser.add_argument("-f", "--format", choices=sudoku_io.FORMATS + ("corpus",), help="input format (default: from the file extension, .sdkb is a binary corpus)")
+    parser.add_argument("--output-format", default="lines", choices=("lines", "csv"), help="csv writes puzzle,solution pairs")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=256, help="puzzles per task sent to a worker")
+    parser.add_argument("--backend", default="backtrack", choices=BACKENDS)
+    parser.add_argument("--var-order", default="mrv", choices=list(VARIABLE_ORDERINGS))
+    parser.add_argument("--value-order", default="ascending", choices=list(VALUE_ORDERINGS))
+    parser.add_argument("--propagation", default="full", choices=list(PROPAGATION_LEVELS))
+    parser.add_argument("--search", default="recursive", choices=list(SEARCH_ENGINES))
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per puzzle before giving up")
+    parser.add_argument("--max-nodes", type=int, default=None, help="search nodes allowed per puzzle before giving up")
+    parser.add_argument("--count", type=int, metavar="K", help="write the number of solutions (up to K) instead of a solution; 2 checks uniqueness")
+    parser.add_argument("--cache", type=int, metavar="N", help="keep up to N solutions per worker, shared by symmetric variants of a puzzle")
+    parser.add_argument("--cache-file", help="load the cache from this file; with -w 1 it is also saved back")
+    parser.add_argument("--vector", action="store_true", help="validate and apply singles to whole chunks with NumPy before searching")
+    parser.add_argument("--generate", type=int, metavar="N", help="generate N unique puzzles instead of solving")
+    parser.add_argument("--difficulty", default="hard", choices=list(DIFFICULTIES.values()))
+    parser.add_argument("--seed", type=int, default=None, help="seed for --generate")
+    parser.add_argument("--box", type=int, default=3, choices=GENERATE_BOXES, help="box width for --generate: 3 for 9x9, 4 for 16x16 (a few seconds per puzzle; 25x25 is too slow to generate)")
+    args = parser.parse_args(argv)
+
+    if args.vector:
+        import sudoku_vector
+        if sudoku_vector.np is None:
+            parser.error("--vector needs NumPy")
+    if args.generate is not None and args.generate < 0:
+        parser.error("--generate must not be negative")
+    if args.count is not None and args.count < 1:
+        parser.error("--count must be at least 1")
+    if args.count is not None and (args.cache or args.cache_file):
+        parser.error("--cache and --cache-file do not apply to --count")
+
+    if args.generate is not None:
+        difficulty = {name: level for level, name in DIFFICULTIES.items()}[args.difficulty]
+        target = sudoku_io.open_output(args.output)
+        try:
+            sudoku_io.write_lines(target, generate_puzzles(args.generate, difficulty, args.workers, args.seed, args.box))
+        finally:
+            if target is not sys.stdout:
+                target.close()
+        return
+
+    options = {
+        "backend": args.backend,
+        "var_order": args.var_order,
+        "value_order": args.value_order,
+        "propagation": args.propagation,
+        "search": args.search,
+        "timeout": args.timeout,
+        "max_nodes": args.max_nodes,
+        "count": args.count,
+        "cache": args.cache or (10000 if args.cache_file else None),
+        "cache_file": args.cache_file,
+        "vector": args.vector,
+    }
+    fmt = args.format or sudoku_io.detect_format(args.input)
+    if fmt == "corpus" and args.input == "-":
+        parser.error("a corpus must be read from a file")
+    source = None if fmt == "corpus" else sudoku_io.open_input(args.input)
+    target = sudoku_io.open_output(args.output)
+    start = time.perf_counter()
+    count = 0
+
+    def counted(results):
+        nonlocal count
+        for result in results:
+            count += 1
+            yield result
+
+    try:
+        if fmt == "corpus":
+            originals = sudoku_corpus.shared_corpus(args.input)  # Iterates as one-line strings
+            results = counted(solve_corpus(args.input, args.workers, args.chunk_size, **options))
+        elif args.output_format == "csv":
+            puzzles, originals = itertools.tee(sudoku_io.read_puzzles(source, fmt))
+            results = counted(solve_batch(puzzles, args.workers, args.chunk_size, **options))
+        else:
+            results = counted(solve_batch(sudoku_io.read_puzzles(source, fmt), args.workers, args.chunk_size, **options))
+        if args.output_format == "csv":
+            sudoku_io.write_csv(target, zip(originals, results))
+        else:
+            sudoku_io.write_lines(target, results)
+    finally:
+        if source not in (None, sys.stdin):
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    if args.cache_file and (args.workers or os.cpu_count() or 1) == 1:
+        # Built with the file if no puzzle reached the cache, so an empty run saves it unchanged
+        sudoku_cache.process_cache(options["cache"], args.cache_file).save(args.cache_file)
+    elapsed = time.perf_counter() - start
+    print(f"Solved {count} puzzles in {elapsed:.2f} s ({count / max(elapsed, 1e-9):.0f} puzzles/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import sudoku_io
+from sudoku_core import DIFFICULTIES, SudokuSolver, generate_valid_puzzle
+
+# Reproducible benchmark of solver configurations over fixed corpora. The generated corpora
+# are rebuilt from a fixed seed on every run and the hard instances are read from
+# bench_data, so two runs of the same tree measure the same puzzles.
+#
+#   python bench.py                          all configurations, default corpora
+#   python bench.py -c mrv/full -c dlx -n 50 some configurations, 50 puzzles per level
+#   python bench.py -o before.json           also write the results as JSON
+
+HARDEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_data", "hardest.txt")
+
+# Configuration name -> SudokuSolver options
+CONFIGS = {
+    "mrv/full": {"var_order": "mrv", "propagation": "full"},
+    "mrv/singles": {"var_order": "mrv", "propagation": "singles"},
+    "mrv/none": {"var_order": "mrv", "propagation": "none"},
+    "mrv-degree/full": {"var_order": "mrv-degree", "propagation": "full"},
+    "mrv+lcv/full": {"var_order": "mrv", "value_order": "lcv", "propagation": "full"},
+    "row-major/full": {"var_order": "row-major", "propagation": "full"},
+    "mrv/full/iterative": {"var_order": "mrv", "propagation": "full", "search": "iterative"},
+    "mrv/none/iterative": {"var_order": "mrv", "propagation": "none", "search": "iterative"},
+    "dlx": {"backend": "dlx"},
+}
+
+
+def build_corpora(count, seed):
+    # easy/medium/hard from generate_valid_puzzle with a fixed seed, plus the bundled instances
+    corpora = {}
+    for level, name in DIFFICULTIES.items():
+        random.seed(seed + level)
+        corpora[name] = [
+            "".join(str(num) for row in generate_valid_puzzle(level) for num in row)
+            for _ in range(count)
+        ]
+    with open(HARDEST_PATH) as stream:
+        corpora["hardest"] = list(sudoku_io.read_lines(stream))
+    return corpora
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def run_config(options, puzzles, measure_memory):
+    latencies = []
+    nodes = 0
+    solved = 0
+    start = time.perf_counter()
+    for puzzle in puzzles:
+        begin = time.perf_counter_ns()
+        solver = SudokuSolver(puzzle, verbose=False, trace="off", stats=True, **options)
+        solution, _ = solver.solve()
+        latencies.append(time.perf_counter_ns() - begin)
+        nodes += solver.stats.nodes
+        solved += bool(solution)
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if measure_memory:
+        # Separate pass, since tracemalloc slows every allocation down
+        tracemalloc.start()
+        for puzzle in puzzles:
+            SudokuSolver(puzzle, verbose=False, trace="off", stats=True, **options).solve()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "puzzles": len(puzzles),
+        "solved": solved,
+        "puzzles_per_sec": len(puzzles) / elapsed if elapsed else None,
+        "p50_ms": percentile(latencies, 0.50) / 1e6,
+        "p99_ms": percentile(latencies, 0.99) / 1e6,
+        "nodes_per_puzzle": nodes / len(puzzles),
+        "peak_kib": None if peak is None else peak / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SudokuSolver configurations.")
+    parser.add_argument("-c", "--config", action="append", choices=list(CONFIGS), help="configuration to run (repeatable, default: all)")
+    parser.add_argument("-n", "--count", type=int, default=20, help="puzzles per generated difficulty level")
+    parser.add_argument("--seed", type=int, default=2024, help="seed for the generated corpora")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    corpora = build_corpora(args.count, args.seed)
+    results = []
+    print(f"{'config':<22}{'corpus':<10}{'solved':>8}{'puz/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'nodes':>10}{'peak KiB':>10}")
+    for name in args.config or CONFIGS:
+        for corpus, puzzles in corpora.items():
+            SudokuSolver(puzzles[0], verbose=False, trace="off", **CONFIGS[name]).solve()  # Warm up
+            result = run_config(CONFIGS[name], puzzles, not args.no_memory)
+            result.update(config=name, corpus=corpus)
+            results.append(result)
+            peak = "-" if result["peak_kib"] is None else f"{result['peak_kib']:.0f}"
+            print(f"{name:<22}{corpus:<10}{result['solved']:>8}{result['puzzles_per_sec']:>10.1f}"
+                  f"{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['nodes_per_puzzle']:>10.1f}{peak:>10}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "seed": args.seed,
+                "count": args.count,
+                "python": sys.version.split()[0],
+                "implementation": platform.python_implementation(),
+                "machine": platform.machine(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as stream:
+            json.dump(report, stream, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+from math import isqrt
+import threading
+
+# Exact-cover encoding of an n*n x n*n Sudoku for Knuth's Dancing Links (Algorithm X).
+# Matrix rows are the (cell, digit) placements, 729 on 9x9; the columns are the
+# constraints "cell is filled", "row has digit", "column has digit" and "box has digit",
+# 324 on 9x9. Row id = cell * side + (digit - 1).
+
+
+class DancingLinks:
+    def __init__(self, box=3):
+        # Node 0 is the root, column headers follow, then the matrix nodes.
+        # Links live in flat lists indexed by node, which is much cheaper than node objects.
+        side = box * box
+        cells = side * side
+        self.side = side
+        columns = 4 * cells
+        rows = cells * side
+        count = 1 + columns + rows * 4
+        self.left = [0] * count
+        self.right = [0] * count
+        self.up = list(range(count))
+        self.down = list(range(count))
+        self.column = [0] * count  # Header node of every node
+        self.row_id = [0] * count  # Matrix row of every node
+        self.size = [0] * (columns + 1)  # Remaining nodes per column
+        self.first_node = [0] * rows  # Cell-constraint node of every matrix row
+
+        for header in range(columns + 1):
+            self.left[header] = header - 1 if header else columns
+            self.right[header] = header + 1 if header < columns else 0
+
+        node = columns + 1
+        for row_id in range(rows):
+            cell, digit = divmod(row_id, side)
+            row, col = divmod(cell, side)
+            block = box * (row // box) + col // box
+            headers = (
+                1 + cell,
+                1 + cells + row * side + digit,
+                1 + 2 * cells + col * side + digit,
+                1 + 3 * cells + block * side + digit,
+            )
+            self.first_node[row_id] = node
+            for offset, header in enumerate(headers):
+                current = node + offset
+                # Append to the bottom of the column
+                self.column[current] = header
+                self.row_id[current] = row_id
+                self.up[current] = self.up[header]
+                self.down[current] = header
+                self.down[self.up[header]] = current
+                self.up[header] = current
+                self.size[header] += 1
+                # Circular horizontal links within the row
+                self.left[current] = node + (offset - 1) % 4
+                self.right[current] = node + (offset + 1) % 4
+            node += 4
+
+        self.covered = []  # Columns covered by the givens of the current puzzle
+        self.solution = []  # Row ids chosen by the search
+        self.steps = None
+        self.limit = 0
+        self.found = 0
+        self.on_solution = None
+        self.should_stop = None  # Called once per node; True aborts the search
+        self.aborted = False
+
+    def cover(self, header):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def load(self, grid):
+        # Cover the columns satisfied by the givens; False if two givens clash
+        for cell, num in enumerate(grid):
+            if num == 0:
+                continue
+            node = self.first_node[cell * self.side + num - 1]
+            for header in (self.column[node + offset] for offset in range(4)):
+                if self.right[self.left[header]] != header:  # Already covered by another given
+                    self.reset()
+                    return False
+                self.cover(header)
+                self.covered.append(header)
+        return True
+
+    def reset(self):
+        # Uncover in reverse order, which restores the matrix exactly for the next puzzle
+        while self.covered:
+            self.uncover(self.covered.pop())
+
+    def search(self):
+        # Algorithm X; returns True once the solution limit has been reached
+        right, down, size, column = self.right, self.down, self.size, self.column
+        if self.should_stop is not None and self.should_stop():
+            # Unwind as if the limit had been reached, so every cover is undone on the way out
+            self.aborted = True
+            return True
+        if right[0] == 0:  # Every constraint satisfied
+            self.found += 1
+            if self.on_solution:
+                self.on_solution(self.solution)
+            return self.found >= self.limit
+
+        # Branch on the column with the fewest remaining rows
+        best = right[0]
+        header = right[best]
+        while header != 0 and size[best] > 1:
+            if size[header] < size[best]:
+                best = header
+            header = right[header]
+        if size[best] == 0:
+            return False
+
+        self.cover(best)
+        done = False
+        node = down[best]
+        while node != best:
+            row_id = self.row_id[node]
+            if self.steps is not None:
+                self.record(row_id)
+            self.solution.append(row_id)
+            j = right[node]
+            while j != node:
+                self.cover(column[j])
+                j = right[j]
+            done = self.search()
+            j = self.left[node]
+            while j != node:
+                self.uncover(column[j])
+                j = self.left[j]
+            self.solution.pop()
+            if done:
+                break
+            if self.steps is not None:
+                self.steps.add(row_id // self.side, 0, 0, "backtrack")
+            node = down[node]
+        self.uncover(best)
+        return done
+
+    def record(self, row_id):
+        # Step for a placement; the candidate mask is read off the cell's constraint column
+        cell, digit = divmod(row_id, self.side)
+        header = self.column[self.first_node[row_id]]
+        mask = 0
+        node = self.down[header]
+        while node != header:
+            mask |= 1 << (self.row_id[node] % self.side)
+            node = self.down[node]
+        self.steps.add(cell, digit + 1, mask, "dlx")
+
+    def run(self, grid, limit, on_solution=None, steps=None, should_stop=None):
+        # Search from grid for up to limit solutions and leave the matrix clean afterwards
+        self.limit = limit
+        self.found = 0
+        self.on_solution = on_solution
+        self.steps = steps
+        self.should_stop = should_stop
+        self.aborted = False
+        if limit > 0 and self.load(grid):  # A limit of 0 asks for nothing, so skip the search
+            self.search()
+            self.reset()
+        self.on_solution = None
+        self.steps = None
+        self.should_stop = None
+        return self.found
+
+
+_matrices = {}  # Box width -> matrix
+_lock = threading.Lock()  # The shared matrices are mutated during search
+
+
+def shared_matrix(box=3):
+    # A matrix is built once per grid size and process and reused for every puzzle
+    if box not in _matrices:
+        _matrices[box] = DancingLinks(box)
+    return _matrices[box]
+
+
+def flatten(puzzle):
+    return [num for row in puzzle for num in row]
+
+
+def solve_grid(grid, steps=None, should_stop=None):
+    # Solve a flat grid (81 cells, or 256 / 625 for 16x16 / 25x25) in place; returns True if a
+    # solution was found, False if there is none and None if should_stop() cut the search
+    # short. Steps are recorded through steps.add(cell, num, mask, rule) when a trace is given
+    side = isqrt(len(grid))
+    solution = []
+
+    def keep(rows):
+        solution.extend(rows)
+
+    with _lock:
+        matrix = shared_matrix(isqrt(side))
+        found = matrix.run(grid, 1, keep, steps, should_stop)
+        if matrix.aborted:
+            return None
+    for row_id in solution:
+        grid[row_id // side] = row_id % side + 1
+    return found == 1
+
+
+def count_grid(grid, limit=None, should_stop=None):
+    # Number of solutions of a flat grid, stopping early once limit is reached; None if
+    # should_stop() cut the count short
+    with _lock:
+        matrix = shared_matrix(isqrt(isqrt(len(grid))))
+        found = matrix.run(grid, float("inf") if limit is None else limit, should_stop=should_stop)
+        return None if matrix.aborted else found
+
+
+def count_solutions(puzzle, limit=None):
+    # Number of solutions of a nested puzzle, stopping early once limit is reached
+    return count_grid(flatten(puzzle), limit)
+
+
+def enumerate_solutions(puzzle, limit=None):
+    # Every solution of a nested puzzle (up to limit), each as a nested list
+    side = len(puzzle)
+    base = flatten(puzzle)
+    solutions = []
+
+    def keep(rows):
+        grid = base[:]
+        for row_id in rows:
+            grid[row_id // side] = row_id % side + 1
+        solutions.append([grid[row * side:row * side + side] for row in range(side)])
+
+    with _lock:
+        shared_matrix(isqrt(side)).run(base, float("inf") if limit is None else limit, keep)
+    return solutions
@@ -0,0 +1,206 @@
+from collections import OrderedDict
+from itertools import permutations, product
+import os
+
+import sudoku_io
+from sudoku_core import RESULT_UNSOLVABLE, VALUE_CHARS, SudokuSolver
+
+# Solution cache keyed by a canonical form of the puzzle, so every puzzle that differs from
+# a cached one only by relabelled digits, rows or columns moved within their band or stack,
+# swapped bands or stacks, or transposition is answered without a search.
+#
+# The canonical form orders bands, rows, stacks and columns by invariants of the clue
+# pattern (clue counts, and where the clues fall), relabels the digits by first appearance
+# and keeps the smallest grid among the orderings that tie on those invariants. True
+# minlex over all 2 * 6^8 transforms would cost far more than a solve, so tie enumeration
+# is capped at TIE_LIMIT orderings; puzzles past the cap still get a consistent key, they
+# just may not meet their symmetric twins in the cache. The cached solution is mapped back
+# through the inverse of the transform. Puzzles with several solutions get a valid one,
+# which need not be the one solve() would have found first.
+
+TIE_LIMIT = 64  # Orderings compared per puzzle before settling for the first
+
+
+def tie_orderings(items, key):
+    # Every ordering of items sorted by key, with runs of equal keys in any order
+    ordered = sorted(items, key=key)
+    runs = []
+    for item in ordered:
+        if runs and key(runs[-1][0]) == key(item):
+            runs[-1].append(item)
+        else:
+            runs.append([item])
+    return [sum(choice, ()) for choice in product(*(list(permutations(run)) for run in runs))]
+
+
+def count_orderings(items, key):
+    # len(tie_orderings(items, key)) without building them
+    total = 1
+    counts = {}
+    for item in items:
+        k = key(item)
+        counts[k] = counts.get(k, 0) + 1
+        total *= counts[k]
+    return total
+
+
+def canonical_form(grid, box=3):
+    # (key, order, labels) of a flat grid: canonical cell i holds original cell order[i] and
+    # canonical digit labels[d] stands for original digit d. key is the relabelled grid as
+    # a one-line string
+    side = box * box
+    best = None
+    for transposed in (False, True):
+        if transposed:
+            cells = [[col * side + row for col in range(side)] for row in range(side)]
+        else:
+            cells = [[row * side + col for col in range(side)] for row in range(side)]
+        given = [[grid[cell] != 0 for cell in line] for line in cells]
+        row_counts = [sum(line) for line in given]
+        col_counts = [sum(given[row][col] for row in range(side)) for col in range(side)]
+
+        # Invariants of a row: its clue count, the clue counts of the columns it hits and how
+        # its clues spread over the stacks; likewise for columns
+        row_keys = [
+            (
+                -row_counts[row],
+                tuple(sorted(col_counts[col] for col in range(side) if given[row][col])),
+                tuple(sorted(sum(given[row][stack * box:stack * box + box]) for stack in range(box))),
+            )
+            for row in range(side)
+        ]
+        col_keys = [
+            (
+                -col_counts[col],
+                tuple(sorted(row_counts[row] for row in range(side) if given[row][col])),
+                tuple(sorted(sum(given[row][col] for row in range(band * box, band * box + box)) for band in range(box))),
+            )
+            for col in range(side)
+        ]
+        band_key = lambda band: tuple(sorted(row_keys[band * box + row] for row in range(box)))
+        stack_key = lambda stack: tuple(sorted(col_keys[stack * box + col] for col in range(box)))
+        bands = range(box)
+        in_band = [tuple(range(band * box, band * box + box)) for band in bands]
+        in_stack = [tuple(range(stack * box, stack * box + box)) for stack in bands]
+
+        total = count_orderings(bands, band_key) * count_orderings(bands, stack_key)
+        for band in bands:
+            total *= count_orderings(in_band[band], row_keys.__getitem__)
+            total *= count_orderings(in_stack[band], col_keys.__getitem__)
+        if total <= TIE_LIMIT:
+            row_choices = [tie_orderings(in_band[band], row_keys.__getitem__) for band in bands]
+            col_choices = [tie_orderings(in_stack[stack], col_keys.__getitem__) for stack in bands]
+            band_choices = tie_orderings(bands, band_key)
+            stack_choices = tie_orderings(bands, stack_key)
+        else:  # Too many ties to compare them all; take the first ordering of each
+            row_choices = [tie_orderings(in_band[band], row_keys.__getitem__)[:1] for band in bands]
+            col_choices = [tie_orderings(in_stack[stack], col_keys.__getitem__)[:1] for stack in bands]
+            band_choices = tie_orderings(bands, band_key)[:1]
+            stack_choices = tie_orderings(bands, stack_key)[:1]
+
+        for band_order, stack_order in product(band_choices, stack_choices):
+            for rows in product(*(row_choices[band] for band in band_order)):
+                row_order = sum(rows, ())
+                for cols in product(*(col_choices[stack] for stack in stack_order)):
+                    col_order = sum(cols, ())
+                    order = [cells[row][col] for row in row_order for col in col_order]
+                    labels = [0] * (side + 1)
+                    next_label = 1
+                    relabelled = []
+                    for cell in order:
+                        num = grid[cell]
+                        if num and not labels[num]:
+                            labels[num] = next_label
+                            next_label += 1
+                        relabelled.append(labels[num])
+                    if best is None or relabelled < best[0]:
+                        best = (relabelled, order, labels)
+
+    relabelled, order, labels = best
+    # Digits missing from the clues get the remaining labels in increasing order
+    unused = iter(label for label in range(1, side + 1) if label not in labels)
+    labels = [0] + [labels[num] or next(unused) for num in range(1, side + 1)]
+    return "".join(VALUE_CHARS[num] for num in relabelled), order, labels
+
+
+class SolutionCache:
+    # Bounded LRU of canonical puzzle -> canonical solution (None for unsolvable puzzles),
+    # in front of SudokuSolver.solve()
+    def __init__(self, capacity=10000, path=None):
+        if capacity < 1:
+            raise ValueError(f"Cache capacity must be positive: {capacity}")
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def solve(self, puzzle, timeout=None, max_nodes=None, cancel=None, **options):
+        # Same arguments and return value as SudokuSolver(puzzle, **options).solve(...), except
+        # that a hit returns an empty step trace
+        solver = SudokuSolver(puzzle, **options)
+        if not solver.is_valid():
+            return solver.solve()  # Reports the invalid puzzle the usual way
+        key, order, labels = canonical_form(solver.grid, solver.geo.box)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution = self.entries[key]
+            if solution is None:
+                return False, RESULT_UNSOLVABLE
+            digits = [0] * len(labels)
+            for num, label in enumerate(labels):
+                digits[label] = num
+            for index, cell in enumerate(order):
+                solver.grid[cell] = digits[VALUE_CHARS.index(solution[index])]
+            return solver.result(), solver.steps
+
+        self.misses += 1
+        solution, code = solver.solve(timeout, max_nodes, cancel)
+        if solution:
+            self.store(key, "".join(VALUE_CHARS[labels[solver.grid[cell]]] for cell in order))
+        elif code == RESULT_UNSOLVABLE:
+            self.store(key, None)
+        return solution, code
+
+    def store(self, key, solution):
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def as_dict(self):
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def save(self, path):
+        # puzzle,solution CSV in LRU order, oldest first; unsolvable puzzles have no solution
+        with open(path, "w", newline="") as stream:
+            sudoku_io.write_csv(stream, self.entries.items())
+
+    def load(self, path):
+        with open(path, newline="") as stream:
+            for key, solution in sudoku_io.read_csv(stream):
+                self.store(key, solution)
+
+
+_process_cache = None
+
+
+def process_cache(capacity=10000, path=None):
+    # One cache per process, created on first use; batch workers each keep their own
+    global _process_cache
+    if _process_cache is None:
+        _process_cache = SolutionCache(capacity, path)
+    return _process_cache
@@ -0,0 +1,1004 @@
+# Solver, validator and puzzle generator. Nothing here imports tkinter, so this module is
+# safe to use from worker processes, servers and headless machines.
+from array import array
+from itertools import combinations
+from math import isqrt
+import random
+import sys
+from time import perf_counter_ns
+
+import dlx
+import sudoku_io
+
+FULL_MASK = (1 << 9) - 1  # Bitmask with all nine candidates set (bit 0 is digit 1)
+# Cell characters of the one-line format; digits above 9 are written A, B, C, ... so a 16x16
+# grid uses 1-9 and A-G, and a 25x25 grid 1-9 and A-P
+VALUE_CHARS = "0123456789ABCDEFGHIJKLMNOP"
+CHAR_VALUES = {char: value for value, char in enumerate(VALUE_CHARS)}
+CHAR_VALUES.update({char.lower(): value for char, value in CHAR_VALUES.items() if char.isalpha()})
+CHAR_VALUES["."] = 0
+BOX_SIZES = range(2, 6)  # Box widths n of the supported n*n x n*n grids: 4x4 up to 25x25
+
+
+def mask_to_values(mask):
+    # Expand a candidate bitmask into the digits it contains
+    values = []
+    while mask:
+        low = mask & -mask
+        values.append(low.bit_length())
+        mask ^= low
+    return values
+
+
+class Geometry:
+    # Lookup tables for one grid size, shared by every solver instance of that size and built
+    # once, so the hot loops only index into tuples. box is the box width n; the grid is
+    # side = n * n cells wide and cells are numbered row * side + col.
+    def __init__(self, box):
+        side = box * box
+        self.box = box
+        self.side = side
+        self.cells = side * side
+        self.full_mask = (1 << side) - 1  # Every digit's bit set, bit 0 is digit 1
+        self.cell_row = tuple(cell // side for cell in range(self.cells))
+        self.cell_col = tuple(cell % side for cell in range(self.cells))
+        self.cell_box = tuple(box * (cell // (side * box)) + (cell % side) // box for cell in range(self.cells))
+        rows = tuple(tuple(range(row * side, row * side + side)) for row in range(side))
+        cols = tuple(tuple(range(col, self.cells, side)) for col in range(side))
+        boxes = tuple(
+            tuple(
+                (band * box + row) * side + stack * box + col
+                for row in range(box)
+                for col in range(box)
+            )
+            for band in range(box)
+            for stack in range(box)
+        )
+        self.units = rows + cols + boxes  # Rows 0..side-1, then columns, then boxes
+        self.unit_sets = tuple(frozenset(unit) for unit in self.units)
+        self.cell_units = tuple(
+            (self.cell_row[cell], side + self.cell_col[cell], 2 * side + self.cell_box[cell])
+            for cell in range(self.cells)
+        )  # Units of every cell
+        self.peers = tuple(
+            tuple(sorted(set().union(*(self.units[unit] for unit in self.cell_units[cell])) - {cell}))
+            for cell in range(self.cells)
+        )  # The 3 * side - 2 * box - 1 cells sharing a unit with every cell
+
+
+GEOMETRIES = {}
+
+
+def geometry(box=3):
+    if box not in GEOMETRIES:
+        if box not in BOX_SIZES:
+            raise ValueError(f"Unsupported box size: {box}")
+        GEOMETRIES[box] = Geometry(box)
+    return GEOMETRIES[box]
+
+
+def puzzle_box(puzzle):
+    # Box width of a nested list, one-line string or corpus record puzzle; 3 when the shape
+    # fits no grid, which load() then reports as invalid
+    if isinstance(puzzle, (bytes, memoryview)):
+        return sudoku_io.RECORD_BOXES.get(len(puzzle), 3)
+    side = len(puzzle) if not isinstance(puzzle, str) else isqrt(len(puzzle))
+    box = isqrt(side)
+    return box if box in BOX_SIZES and box * box == side else 3
+
+
+def puzzle_string(puzzle):
+    # One-line string of a nested list puzzle
+    return "".join(VALUE_CHARS[num] for row in puzzle for num in row)
+
+
+# Tables of the classic 9x9 grid, kept as module-level names for the GUI and older callers
+STANDARD = geometry(3)
+CELL_ROW = STANDARD.cell_row
+CELL_COL = STANDARD.cell_col
+CELL_BOX = STANDARD.cell_box  # Box index of every cell
+UNITS = STANDARD.units  # Rows 0-8, columns 9-17, boxes 18-26
+UNIT_SETS = STANDARD.unit_sets
+CELL_UNITS = STANDARD.cell_units  # Units of every cell
+PEERS = STANDARD.peers  # The 20 cells sharing a unit with every cell
+
+# Strategy names accepted by SudokuSolver, mapped to the methods implementing them
+VARIABLE_ORDERINGS = {
+    "row-major": "select_row_major",  # First empty cell in reading order (the original behaviour)
+    "mrv": "select_mrv",  # Fewest remaining candidates
+    "mrv-degree": "select_mrv_degree",  # Fewest candidates, ties go to the cell with most empty peers
+}
+VALUE_ORDERINGS = {
+    "ascending": "order_ascending",  # 1 upwards
+    "lcv": "order_lcv",  # Least constraining value first
+}
+SEARCH_ENGINES = {
+    "recursive": "backtrack_solve",
+    "iterative": "iterative_solve",  # Explicit stack; no recursion limit, can pause() and resume()
+}
+BACKENDS = ("backtrack", "dlx")  # backtrack_solve, or the Dancing Links exact-cover search in dlx.py
+# Rules run before search, cheapest first; the rule name is recorded with every step it makes
+PROPAGATION_LEVELS = {
+    "none": (),
+    "singles": ("apply_naked_singles", "apply_hidden_singles"),
+    "full": (
+        "apply_naked_singles",
+        "apply_hidden_singles",
+        "apply_naked_pairs",
+        "apply_hidden_pairs",
+        "apply_pointing",
+        "apply_box_line",
+        "apply_naked_triples",
+        "apply_hidden_triples",
+    ),
+}
+TRACE_LEVELS = ("off", "placements", "full")  # off records nothing, placements skips undos and eliminations
+STEP_RULES = (
+    "search",
+    "backtrack",
+    "dlx",
+    "naked single",
+    "hidden single",
+    "naked pair",
+    "hidden pair",
+    "naked triple",
+    "hidden triple",
+    "pointing",
+    "box-line reduction",
+)
+RULE_CODES = {rule: code for code, rule in enumerate(STEP_RULES)}
+
+
+class StepTrace:
+    # Solving steps packed one per word: cell in the low bits, then the digit, a 4-bit rule
+    # code and the cell's candidate mask. On 9x9 that is cell in bits 0-6, digit in bits 7-10,
+    # rule in bits 11-14 and the 9-bit mask above, 4 bytes per step; 16x16 and 25x25 steps
+    # need up to 44 bits and go into 8-byte words. Steps are decoded into
+    # (row, col, num, dom, rule) tuples only when read, so replaying them in the GUI works as
+    # before.
+    def __init__(self, level="full", geo=STANDARD):
+        self.geo = geo
+        self.num_shift = (geo.cells - 1).bit_length()
+        self.rule_shift = self.num_shift + geo.side.bit_length()
+        self.mask_shift = self.rule_shift + 4
+        self.words = array("I" if self.mask_shift + geo.side <= 32 else "Q")
+        self.placements_only = level == "placements"
+
+    def add(self, cell, num, mask, rule):
+        if num == 0 and self.placements_only:
+            return
+        self.words.append(cell | num << self.num_shift | RULE_CODES[rule] << self.rule_shift | mask << self.mask_shift)
+
+    def decode(self, word):
+        cell = word & ((1 << self.num_shift) - 1)
+        num = word >> self.num_shift & ((1 << (self.rule_shift - self.num_shift)) - 1)
+        rule = STEP_RULES[word >> self.rule_shift & 0xF]
+        return self.geo.cell_row[cell], self.geo.cell_col[cell], num, set(mask_to_values(word >> self.mask_shift)), rule
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index):
+        return self.decode(self.words[index])
+
+    def __iter__(self):
+        return map(self.decode, self.words)
+
+# Second element of the (False, code) tuple solve() returns when it has no solution
+RESULT_INVALID = 0  # The givens break a rule
+RESULT_UNSOLVABLE = 1  # Search exhausted without a solution
+RESULT_ABORTED = 2  # Timed out, ran out of nodes or was cancelled; see stats.aborted
+RESULT_PAUSED = 3  # pause() was called; the iterative engine continues with resume()
+LIMIT_CHECK_INTERVAL = 256  # Nodes between deadline and cancel checks
+HOOK_EVENTS = ("node", "backtrack", "phase")  # node(depth, cell), backtrack(depth, cell), phase(name, ns)
+
+
+class SolverStats:
+    # Counters and per-phase timings of one solve, collected only when SudokuSolver(stats=True)
+    def __init__(self):
+        self.nodes = 0  # Branching points expanded by search
+        self.backtracks = 0  # Guesses undone
+        self.max_depth = 0  # Deepest branching point
+        self.reductions = 0  # Candidates removed by forward checking and propagation rules
+        self.rule_hits = {}  # Rule name -> placements and eliminations it made
+        self.timings_ns = {}  # Phase name -> duration from perf_counter_ns
+        self.aborted = None  # "timeout", "node budget" or "cancelled" when solve() gave up
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "reductions": self.reductions,
+            "rule_hits": dict(self.rule_hits),
+            "timings_ns": dict(self.timings_ns),
+            "aborted": self.aborted,
+        }
+
+
+class CancelToken:
+    # Shared with a running solve() and set from another thread to stop it. Any object with
+    # an is_set() method works in its place, e.g. threading.Event or multiprocessing.Event
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def is_set(self):
+        return self.cancelled
+
+
+class SearchAborted(Exception):
+    # Raised inside the search when a limit of solve() is hit; never escapes solve()
+    pass
+
+
+class SudokuSolver:
+    def __init__(self, puzzle, var_order="mrv", value_order="ascending", propagation="full", backend="backtrack", verbose=True, trace="full", stats=False, hooks=None, search="recursive", box=None):
+        # box is the box width of the grid (3 for 9x9, 4 for 16x16, 5 for 25x25); by default
+        # it follows from the size of the puzzle
+        if var_order not in VARIABLE_ORDERINGS:
+            raise ValueError(f"Unknown variable ordering: {var_order}")
+        if value_order not in VALUE_ORDERINGS:
+            raise ValueError(f"Unknown value ordering: {value_order}")
+        if propagation not in PROPAGATION_LEVELS:
+            raise ValueError(f"Unknown propagation level: {propagation}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown solver backend: {backend}")
+        if search not in SEARCH_ENGINES:
+            raise ValueError(f"Unknown search engine: {search}")
+        if trace not in TRACE_LEVELS:
+            raise ValueError(f"Unknown trace level: {trace}")
+        for event in hooks or ():
+            if event not in HOOK_EVENTS:
+                raise ValueError(f"Unknown hook event: {event}")
+        if isinstance(puzzle, (bytes, memoryview)):
+            # Keep the decoded text rather than the record, so the solver never holds a view
+            # into a corpus mapping that its owner may want to close
+            puzzle = sudoku_io.unpack_record(puzzle)
+        self.puzzle = puzzle
+        self.geo = geometry(box or puzzle_box(puzzle))
+        self.backend = backend
+        self.verbose = verbose  # Print why solve() failed
+        self.size = self.geo.side  # Size of the Sudoku grid
+        self.steps = StepTrace(trace, self.geo)  # Store steps made during solving
+        self.tracing = trace != "off"
+        self.stats = SolverStats() if stats else None
+        self.hooks = hooks or {}  # Optional per-call callbacks for profilers, keyed by HOOK_EVENTS
+        # A single flag keeps the uninstrumented hot path down to one attribute test
+        self.instrumented = bool(stats or hooks)
+        self.limited = False  # Set by solve() when it was given a deadline, node budget or cancel token
+        cells = self.geo.cells
+        self.grid = [0] * cells  # Flat copy of the puzzle, cell index = row * size + col
+        self.row_masks = [0] * self.size  # Digits already placed in each row
+        self.col_masks = [0] * self.size  # Digits already placed in each column
+        self.box_masks = [0] * self.size  # Digits already placed in each box
+        self.candidates = [0] * cells  # Candidate bitmask of every cell
+        self.trail = []  # (cell, bit) candidate removals, popped when backtracking
+        self.buckets = [set() for _ in range(self.size + 1)]  # Empty cells grouped by candidate count, for MRV
+        self.degree = [0] * cells  # Number of empty peers of every cell
+        self.select_cell = getattr(self, VARIABLE_ORDERINGS[var_order])
+        self.order_values = getattr(self, VALUE_ORDERINGS[value_order])
+        self.rules = [getattr(self, name) for name in PROPAGATION_LEVELS[propagation]]
+        self.search_engine = getattr(self, SEARCH_ENGINES[search])
+        self.stack = []  # [cell, values, next value index, trail mark] frames of iterative_solve
+        self.descend = True  # iterative_solve picks a new cell before trying values
+        self.pause_requested = False
+        self.suspended = False  # An iterative search stopped part-way and can be resumed
+        self.load()
+
+    def solve(self, timeout=None, max_nodes=None, cancel=None):
+        # timeout is in seconds; cancel is a CancelToken (or any object with is_set()). When
+        # a limit stops the search, solve() returns (False, RESULT_ABORTED) and the partial
+        # counters stay in self.stats
+        self.set_limits(timeout, max_nodes, cancel)
+        timed = self.instrumented
+        start = perf_counter_ns() if timed else 0
+        valid = self.is_valid()  # Validate the initial puzzle
+        if timed:
+            start = self.end_phase("validate", start)
+        if not valid:
+            if self.verbose:
+                print("Invalid Sudoku puzzle.")
+            return False, RESULT_INVALID
+
+        if self.backend == "dlx":
+            # DLX reports its nodes through should_stop, which then also enforces the limits
+            if self.limited:
+                should_stop = self.limit_reached
+            elif self.stats:
+                should_stop = self.count_dlx_node
+            else:
+                should_stop = None
+            solved = dlx.solve_grid(self.grid, self.steps if self.tracing else None, should_stop)
+            if self.limited:
+                self.stats.nodes = self.nodes_used
+            if timed:
+                self.end_phase("search", start)
+            if solved is None:
+                return False, RESULT_ABORTED
+            if solved:
+                return self.result(), self.steps
+            if self.verbose:
+                print("No solution exists.")
+            return False, RESULT_UNSOLVABLE
+
+        self.initializeDomains()
+        if timed:
+            start = self.end_phase("initialise", start)
+
+        # Search only starts once the propagation rules stall
+        solved = self.propagate()
+        if timed:
+            start = self.end_phase("propagate", start)
+        if not solved:
+            if self.verbose:
+                print("No solution exists.")
+            return False, RESULT_UNSOLVABLE
+        self.stack = []
+        self.descend = True
+        return self.run_search(start)
+
+    def count_solutions(self, limit=None, timeout=None, max_nodes=None, cancel=None):
+        # Number of solutions, stopping as soon as limit of them are found, so limit=2 answers
+        # "is there more than one?" with a small search. Invalid givens count as 0 and None
+        # means a timeout, node budget, cancel token or pause() stopped the count. The count
+        # reuses the propagation and the iterative search of solve(): after each solution the
+        # search backtracks out of it and carries on
+        self.set_limits(timeout, max_nodes, cancel)
+        if not self.is_valid():
+            return 0
+        if self.backend == "dlx":
+            return dlx.count_grid(self.grid, limit, self.limit_reached if self.limited else None)
+        self.initializeDomains()
+        if not self.propagate():
+            return 0
+        self.stack = []
+        self.descend = True
+        found = 0
+        try:
+            while limit is None or found < limit:
+                solved = self.iterative_solve()
+                if solved is None:  # Paused, so the count is incomplete
+                    return None
+                if not solved:
+                    break
+                found += 1
+                if not self.stack:  # Propagation alone filled the grid, so there is nothing to backtrack
+                    break
+                self.descend = False  # Reject this solution and continue with the next value
+        except SearchAborted:
+            return None
+        return found
+
+    def is_unique(self):
+        # True when the puzzle has exactly one solution
+        return self.count_solutions(2) == 1
+
+    def pause(self):
+        # Ask an iterative search to stop at the next node; safe to call from a hook or another
+        # thread. solve() then returns (False, RESULT_PAUSED) and resume() carries on from
+        # the same node. The recursive engine ignores it
+        self.pause_requested = True
+
+    def resume(self, timeout=None, max_nodes=None, cancel=None):
+        # Continue an iterative search that was paused or stopped by a limit. The limits apply
+        # to this call only; the return value is the same as for solve()
+        if not self.suspended:
+            raise RuntimeError("No suspended iterative search to resume")
+        self.set_limits(timeout, max_nodes, cancel)
+        if self.stats:
+            self.stats.aborted = None
+        return self.run_search(perf_counter_ns() if self.instrumented else 0)
+
+    def run_search(self, start):
+        # Search phase shared by solve() and resume()
+        stopped = RESULT_PAUSED
+        try:
+            solved = self.search_engine()
+        except SearchAborted:
+            solved = None
+            stopped = RESULT_ABORTED
+        if self.instrumented:
+            self.end_phase("search", start)
+        self.suspended = solved is None and self.search_engine == self.iterative_solve
+        if solved:
+            return self.result(), self.steps # Return solved puzzle, steps, and domains
+        if solved is None:
+            return False, stopped
+        if self.verbose:
+            print("No solution exists.")
+        return False, RESULT_UNSOLVABLE
+
+    def set_limits(self, timeout, max_nodes, cancel):
+        self.limited = timeout is not None or max_nodes is not None or cancel is not None
+        if self.limited:
+            self.deadline = perf_counter_ns() + int(timeout * 1e9) if timeout is not None else None
+            self.max_nodes = max_nodes
+            self.cancel = cancel
+            self.nodes_used = 0
+            if self.stats is None:
+                self.stats = SolverStats()
+            self.instrumented = True
+
+    def limit_reached(self):
+        # Count one node against the limits given to solve(); the clock and the cancel token
+        # are only consulted every LIMIT_CHECK_INTERVAL nodes
+        self.nodes_used += 1
+        if self.max_nodes is not None and self.nodes_used > self.max_nodes:
+            self.stats.aborted = "node budget"
+        elif self.nodes_used % LIMIT_CHECK_INTERVAL == 0:
+            if self.deadline is not None and perf_counter_ns() > self.deadline:
+                self.stats.aborted = "timeout"
+            elif self.cancel is not None and self.cancel.is_set():
+                self.stats.aborted = "cancelled"
+        return self.stats.aborted is not None
+
+    def end_phase(self, name, start):
+        # Record how long a phase of solve() took and return the time the next phase starts
+        now = perf_counter_ns()
+        if self.stats:
+            # Accumulates, so a resumed search adds to the time already spent
+            self.stats.timings_ns[name] = self.stats.timings_ns.get(name, 0) + now - start
+        if "phase" in self.hooks:
+            self.hooks["phase"](name, now - start)
+        return now
+
+    def load(self):
+        # Rebuild the flat grid and occupancy masks from self.puzzle, False if a digit clashes.
+        # The puzzle is either a nested list or a one-line string (corpus records are decoded
+        # to one in __init__) read straight into the grid
+        geo = self.geo
+        self.row_masks = [0] * geo.side
+        self.col_masks = [0] * geo.side
+        self.box_masks = [0] * geo.side
+        if isinstance(self.puzzle, str):
+            if len(self.puzzle) != geo.cells:
+                return False
+            cells = (CHAR_VALUES.get(char, -1) for char in self.puzzle)
+        else:
+            if len(self.puzzle) != geo.side or any(len(row) != geo.side for row in self.puzzle):
+                return False
+            cells = (num for row in self.puzzle for num in row)
+        valid = True
+        for cell, num in enumerate(cells):
+            self.grid[cell] = num
+            if num != 0:
+                if not 1 <= num <= geo.side:
+                    valid = False
+                    continue
+                bit = 1 << (num - 1)
+                row, col, box = geo.cell_row[cell], geo.cell_col[cell], geo.cell_box[cell]
+                if (self.row_masks[row] | self.col_masks[col] | self.box_masks[box]) & bit:
+                    valid = False
+                self.row_masks[row] |= bit
+                self.col_masks[col] |= bit
+                self.box_masks[box] |= bit
+        return valid
+
+    def result(self):
+        # The solved grid in the shape the puzzle was given in: a string (also for corpus
+        # records), or the caller's nested list filled in place
+        if isinstance(self.puzzle, str):
+            return "".join(VALUE_CHARS[num] for num in self.grid)
+        size = self.size
+        for row in range(size):
+            self.puzzle[row][:] = self.grid[row * size:row * size + size]
+        return self.puzzle
+
+    def is_valid(self):
+        # The puzzle may have been edited since construction, so re-read it
+        return self.load()
+
+    def is_safe(self, row, col, num):
+        return not (self.row_masks[row] | self.col_masks[col] | self.box_masks[self.geo.cell_box[row * self.size + col]]) & (1 << (num - 1))
+    
+    def is_valid_row(self, row, num):
+        return not self.row_masks[row] & (1 << (num - 1))
+
+    def is_valid_col(self, col, num):
+        return not self.col_masks[col] & (1 << (num - 1))
+
+    def is_valid_box(self, start_row, start_col, num):
+        return not self.box_masks[self.geo.cell_box[start_row * self.size + start_col]] & (1 << (num - 1))
+
+    def place(self, cell, num):
+        # O(1) placement: set the digit bit in the row, column and box masks
+        bit = 1 << (num - 1)
+        geo = self.geo
+        self.grid[cell] = num
+        self.row_masks[geo.cell_row[cell]] |= bit
+        self.col_masks[geo.cell_col[cell]] |= bit
+        self.box_masks[geo.cell_box[cell]] |= bit
+        self.buckets[self.candidates[cell].bit_count()].discard(cell)
+        degree = self.degree
+        for peer in geo.peers[cell]:
+            degree[peer] -= 1
+
+    def remove(self, cell, num):
+        # O(1) undo of place()
+        bit = ~(1 << (num - 1))
+        geo = self.geo
+        self.grid[cell] = 0
+        self.row_masks[geo.cell_row[cell]] &= bit
+        self.col_masks[geo.cell_col[cell]] &= bit
+        self.box_masks[geo.cell_box[cell]] &= bit
+        self.buckets[self.candidates[cell].bit_count()].add(cell)
+        degree = self.degree
+        for peer in geo.peers[cell]:
+            degree[peer] += 1
+
+    def free_mask(self, cell):
+        # Digits not yet used by the row, column or box of cell
+        geo = self.geo
+        return geo.full_mask & ~(self.row_masks[geo.cell_row[cell]] | self.col_masks[geo.cell_col[cell]] | self.box_masks[geo.cell_box[cell]])
+
+    def initializeDomains(self):
+        self.trail = []
+        self.buckets = [set() for _ in range(self.size + 1)]
+        grid = self.grid
+        peers = self.geo.peers
+        for cell in range(self.geo.cells):
+            num = grid[cell]
+            self.candidates[cell] = 1 << (num - 1) if num else self.free_mask(cell)
+            if not num:
+                self.buckets[self.candidates[cell].bit_count()].add(cell)
+            self.degree[cell] = sum(1 for peer in peers[cell] if grid[peer] == 0)
+
+
+    def backtrack_solve(self, depth=0):
+        cell = self.select_cell()
+        if cell is None:  # If there are no empty cells, puzzle is solved
+            return True  # Return True
+        if self.instrumented:
+            self.count_node(depth, cell)
+
+        domain = self.candidates[cell]
+        for num in self.order_values(cell, domain):  # Try every candidate of the cell
+            mark = len(self.trail)  # Removals made below this point belong to this attempt
+
+            # Place and forward check the peers; False means some peer ran out of candidates
+            if self.assign(cell, num, "search"):
+                if self.backtrack_solve(depth + 1):
+                    return True
+            # If no solution found with the current number, backtrack
+            if self.instrumented:
+                self.count_backtrack(depth, cell)
+            if self.tracing:
+                self.steps.add(cell, 0, 0, "backtrack")  # Record the backtracking step
+            self.undo(mark)  # Give back the candidates removed by this attempt
+            self.remove(cell, num)  # Backtrack by resetting the cell value
+        return False  # If no solution found from this point, return False
+
+    def iterative_solve(self):
+        # backtrack_solve with the recursion replaced by self.stack, so the depth is not bound
+        # by the interpreter's recursion limit and the search can stop and later carry on from
+        # the same point. Returns True when solved, False when exhausted, None when paused
+        stack = self.stack
+        while True:
+            if self.descend:
+                if self.pause_requested:
+                    self.pause_requested = False
+                    return None
+                cell = self.select_cell()
+                if cell is None:  # If there are no empty cells, puzzle is solved
+                    return True
+                if self.instrumented:
+                    self.count_node(len(stack), cell)  # May raise SearchAborted; nothing is pushed yet
+                stack.append([cell, self.order_values(cell, self.candidates[cell]), 0, 0])
+                self.descend = False
+
+            frame = stack[-1]
+            cell, values, index, mark = frame
+            if index:  # The previous value of this frame led nowhere, so backtrack it
+                if self.instrumented:
+                    self.count_backtrack(len(stack) - 1, cell)
+                if self.tracing:
+                    self.steps.add(cell, 0, 0, "backtrack")
+                self.undo(mark)
+                self.remove(cell, values[index - 1])
+            if index == len(values):  # Every candidate failed, return to the parent frame
+                stack.pop()
+                if not stack:
+                    return False
+                continue
+
+            frame[2] = index + 1
+            frame[3] = len(self.trail)  # Removals made below this point belong to this attempt
+            # Place and forward check the peers; False means some peer ran out of candidates
+            if self.assign(cell, values[index], "search"):
+                self.descend = True
+
+    def revise(self, cell, num):
+        # Remove num from the candidates of the peers of cell, recording each removal
+        bit = 1 << (num - 1)
+        grid = self.grid
+        candidates = self.candidates
+        trail = self.trail
+        buckets = self.buckets
+        for peer in self.geo.peers[cell]:
+            if grid[peer] == 0 and candidates[peer] & bit:
+                count = candidates[peer].bit_count()
+                candidates[peer] ^= bit
+                trail.append((peer, bit))
+                buckets[count].discard(peer)
+                buckets[count - 1].add(peer)
+                if count == 1:  # Domain wiped out, this placement cannot work
+                    return False
+        return True
+
+    def undo(self, mark):
+        # Pop the trail back to mark, restoring every candidate removed since then
+        candidates = self.candidates
+        trail = self.trail
+        buckets = self.buckets
+        while len(trail) > mark:
+            peer, bit = trail.pop()
+            count = candidates[peer].bit_count()
+            candidates[peer] |= bit
+            buckets[count].discard(peer)
+            buckets[count + 1].add(peer)
+
+    def assign(self, cell, num, rule):
+        # Place num in cell, record the step and forward check the peers
+        if self.tracing:
+            self.steps.add(cell, num, self.candidates[cell], rule)  # Record the step
+        self.place(cell, num)
+        if self.stats:
+            mark = len(self.trail)
+            consistent = self.revise(cell, num)
+            self.count_reductions(rule, len(self.trail) - mark)
+            return consistent
+        return self.revise(cell, num)
+
+    def count_node(self, depth, cell):
+        if self.stats:
+            self.stats.nodes += 1
+            if depth > self.stats.max_depth:
+                self.stats.max_depth = depth
+        if "node" in self.hooks:
+            self.hooks["node"](depth, cell)
+        if self.limited and self.limit_reached():
+            raise SearchAborted(self.stats.aborted)
+
+    def count_dlx_node(self):
+        # should_stop for an unlimited DLX solve: counts the node and never stops
+        self.stats.nodes += 1
+        return False
+
+    def count_backtrack(self, depth, cell):
+        if self.stats:
+            self.stats.backtracks += 1
+        if "backtrack" in self.hooks:
+            self.hooks["backtrack"](depth, cell)
+
+    def count_reductions(self, rule, removed):
+        self.stats.reductions += removed
+        if rule != "search":
+            self.stats.rule_hits[rule] = self.stats.rule_hits.get(rule, 0) + 1
+
+    def eliminate(self, cell, mask, rule):
+        # Remove the digits in mask from the candidates of an empty cell, False if none are left
+        removed = self.candidates[cell] & mask
+        if not removed:
+            return True
+        count = self.candidates[cell].bit_count()
+        self.candidates[cell] ^= removed
+        self.buckets[count].discard(cell)
+        self.buckets[self.candidates[cell].bit_count()].add(cell)
+        if self.stats:
+            self.count_reductions(rule, removed.bit_count())
+        while removed:
+            bit = removed & -removed
+            self.trail.append((cell, bit))
+            removed ^= bit
+        if self.tracing:
+            self.steps.add(cell, 0, self.candidates[cell], rule)
+        return self.candidates[cell] != 0
+
+    def propagate(self):
+        # Run the propagation rules to a fixed point, restarting from the cheapest rule after
+        # every change. Each rule returns True on progress, False when stalled and None when
+        # it finds a contradiction
+        progress = True
+        while progress:
+            progress = False
+            for rule in self.rules:
+                result = rule()
+                if result is None:
+                    return False
+                if result:
+                    progress = True
+                    break
+        return True
+
+    def apply_naked_singles(self):
+        # Cells with a single candidate take that digit
+        singles = list(self.buckets[1])
+        for cell in singles:
+            if self.grid[cell] == 0:
+                if not self.assign(cell, self.candidates[cell].bit_length(), "naked single"):
+                    return None
+        return bool(singles)
+
+    def apply_hidden_singles(self):
+        # A digit that fits in only one cell of a unit goes there
+        grid = self.grid
+        candidates = self.candidates
+        full_mask = self.geo.full_mask
+        for unit in self.geo.units:
+            once = twice = placed = 0
+            for cell in unit:
+                if grid[cell]:
+                    placed |= 1 << (grid[cell] - 1)
+                else:
+                    twice |= once & candidates[cell]
+                    once |= candidates[cell]
+            if (once | placed) != full_mask:  # Some digit has nowhere to go
+                return None
+            singles = once & ~twice & ~placed
+            if singles:
+                for cell in unit:
+                    hit = candidates[cell] & singles
+                    if grid[cell] == 0 and hit:
+                        if hit & (hit - 1):  # Two hidden singles claim the same cell
+                            return None
+                        if not self.assign(cell, hit.bit_length(), "hidden single"):
+                            return None
+                return True
+        return False
+
+    def apply_naked_pairs(self):
+        return self.naked_subsets(2, "naked pair")
+
+    def apply_naked_triples(self):
+        return self.naked_subsets(3, "naked triple")
+
+    def apply_hidden_pairs(self):
+        return self.hidden_subsets(2, "hidden pair")
+
+    def apply_hidden_triples(self):
+        return self.hidden_subsets(3, "hidden triple")
+
+    def naked_subsets(self, size, rule):
+        # size cells of a unit whose candidates together hold exactly size digits own those
+        # digits, so the rest of the unit loses them
+        candidates = self.candidates
+        for unit in self.geo.units:
+            empty = [cell for cell in unit if self.grid[cell] == 0]
+            small = [cell for cell in empty if candidates[cell].bit_count() <= size]
+            progress = False
+            for group in combinations(small, size):
+                union = 0
+                for cell in group:
+                    union |= candidates[cell]
+                if union.bit_count() != size:
+                    continue
+                for cell in empty:
+                    if cell not in group and candidates[cell] & union:
+                        progress = True
+                        if not self.eliminate(cell, union, rule):
+                            return None
+            if progress:
+                return True
+        return False
+
+    def hidden_subsets(self, size, rule):
+        # size digits that only fit in the same size cells of a unit leave those cells no
+        # room for any other digit
+        candidates = self.candidates
+        for unit in self.geo.units:
+            empty = [cell for cell in unit if self.grid[cell] == 0]
+            if len(empty) <= size:
+                continue
+            where = {}  # Digit bit -> cells of the unit that can take it
+            for cell in empty:
+                mask = candidates[cell]
+                while mask:
+                    bit = mask & -mask
+                    where.setdefault(bit, []).append(cell)
+                    mask ^= bit
+            digits = [bit for bit, cells in where.items() if len(cells) <= size]
+            progress = False
+            for group in combinations(digits, size):
+                cells = set()
+                union = 0
+                for bit in group:
+                    cells.update(where[bit])
+                    union |= bit
+                if len(cells) != size:
+                    continue
+                for cell in cells:
+                    if candidates[cell] & ~union:
+                        progress = True
+                        if not self.eliminate(cell, ~union & self.geo.full_mask, rule):
+                            return None
+            if progress:
+                return True
+        return False
+
+    def apply_pointing(self):
+        # A digit confined to one row or column inside a box is removed from the rest of that line
+        side = self.size
+        for unit in range(2 * side, 3 * side):
+            result = self.line_box_reduction(unit, "pointing")
+            if result is not False:
+                return result
+        return False
+
+    def apply_box_line(self):
+        # A digit confined to one box inside a row or column is removed from the rest of that box
+        for unit in range(2 * self.size):
+            result = self.line_box_reduction(unit, "box-line reduction")
+            if result is not False:
+                return result
+        return False
+
+    def line_box_reduction(self, unit, rule):
+        # Shared body of pointing and box-line reduction: find digits whose cells in the unit
+        # all lie in one other unit, and clear them from the remainder of that unit
+        candidates = self.candidates
+        geo = self.geo
+        empty = [cell for cell in geo.units[unit] if self.grid[cell] == 0]
+        seen = 0
+        for cell in empty:
+            seen |= candidates[cell]
+        progress = False
+        while seen:
+            bit = seen & -seen
+            seen ^= bit
+            cells = [cell for cell in empty if candidates[cell] & bit]
+            if len(cells) < 2:
+                continue
+            for other in geo.cell_units[cells[0]]:
+                if other == unit or not geo.unit_sets[other].issuperset(cells):
+                    continue
+                for target in geo.units[other]:
+                    if self.grid[target] == 0 and candidates[target] & bit and target not in cells:
+                        progress = True
+                        if not self.eliminate(target, bit, rule):
+                            return None
+        return progress
+
+    def get_domain(self, row, col):
+        # Candidate digits of (row, col) as a set, derived from the occupancy masks
+        return set(mask_to_values(self.free_mask(row * self.size + col)))
+    
+    def find_empty_cell(self):
+        cell = self.select_row_major()
+        return None if cell is None else (self.geo.cell_row[cell], self.geo.cell_col[cell])
+
+    def select_row_major(self):
+        for cell in range(self.geo.cells):
+            if self.grid[cell] == 0:
+                return cell
+        return None
+
+    def select_mrv(self):
+        # The bucket index gives the most constrained cell without scanning the grid
+        for bucket in self.buckets:
+            if bucket:
+                return next(iter(bucket))
+        return None
+
+    def select_mrv_degree(self):
+        for bucket in self.buckets:
+            if bucket:
+                return max(bucket, key=self.degree.__getitem__)
+        return None
+
+    def order_ascending(self, cell, domain):
+        return mask_to_values(domain)
+
+    def order_lcv(self, cell, domain):
+        # Try first the digits that appear in the fewest empty peers' candidates
+        grid = self.grid
+        candidates = self.candidates
+        peers = self.geo.peers[cell]
+
+        def conflicts(num):
+            bit = 1 << (num - 1)
+            return sum(1 for peer in peers if grid[peer] == 0 and candidates[peer] & bit)
+
+        return sorted(mask_to_values(domain), key=conflicts)
+
+
+DIFFICULTIES = {1: "easy", 2: "medium", 3: "hard"}
+HARDEST = max(DIFFICULTIES)
+UNIQUE_CHECK_NODES = 2000  # DLX nodes one uniqueness check of generate_unique_puzzle may take
+SINGLES_RULES = {"naked single", "hidden single"}
+
+
+def generate_valid_puzzle(flag):
+    # flag 1, 2 or 3 asks for an easy, medium or hard puzzle with exactly one solution;
+    # anything else is treated as hard
+    return generate_unique_puzzle(flag if flag in DIFFICULTIES else 3)
+
+
+def random_solution(rng=random, box=3):
+    # A random complete grid: a shuffled first row completed by the solver, then shuffled
+    # bands, rows within bands, stacks and columns within stacks. From 16x16 up, completing
+    # a row by search can take seconds, so the bigger grids start from the shifted-row
+    # pattern with randomly relabelled digits instead
+    side = box * box
+    first_row = rng.sample(range(1, side + 1), side)
+    if box > 3:
+        solution = [[first_row[(box * (row % box) + row // box + col) % side] for col in range(side)] for row in range(side)]
+    else:
+        puzzle = [first_row] + [[0] * side for _ in range(side - 1)]
+        solution, _ = SudokuSolver(puzzle, verbose=False, trace="off").solve()
+    rows = [band * box + row for band in rng.sample(range(box), box) for row in rng.sample(range(box), box)]
+    cols = [stack * box + col for stack in rng.sample(range(box), box) for col in rng.sample(range(box), box)]
+    return [[solution[row][col] for col in cols] for row in rows]
+
+
+def grade_puzzle(puzzle):
+    # Difficulty from what the solver needed rather than the clue count: 1 if singles alone
+    # finish it, 2 if it also needs pairs, triples or line/box reductions, 3 if it needs
+    # search. Returns (level, search nodes, rules used)
+    solver = SudokuSolver(puzzle_string(puzzle), verbose=False, trace="off", stats=True)
+    solution, _ = solver.solve()
+    if not solution:
+        return None, 0, set()
+    rules = set(solver.stats.rule_hits)
+    nodes = solver.stats.nodes
+    if nodes:
+        level = 3
+    elif rules - SINGLES_RULES:
+        level = 2
+    else:
+        level = 1
+    return level, nodes, rules
+
+
+def proven_unique(puzzle, max_nodes=UNIQUE_CHECK_NODES):
+    # True when a DLX count that stops at two finds exactly one solution within max_nodes
+    # search nodes. A count cut short answers False, which may keep a clue that could have
+    # gone but never lets a puzzle with two solutions through
+    nodes = iter(range(max_nodes))
+    return dlx.count_grid(dlx.flatten(puzzle), 2, lambda: next(nodes, None) is None) == 1
+
+
+def generate_unique_puzzle(difficulty=3, rng=random, attempts=20, box=3):
+    # Dig clues out of a random complete grid one at a time. A removal is kept only while
+    # the puzzle is proven_unique and does not grade harder than asked. Grids that cannot
+    # reach the requested grade are retried; after the last attempt the closest puzzle found
+    # is returned. 9x9 checks never come near the node cap; on 16x16 the few removals whose
+    # count would run to hundreds of thousands of nodes are abandoned, which leaves a couple
+    # of extra clues and brings a puzzle down from a minute or more to a few seconds
+    best = None
+    for _ in range(attempts):
+        puzzle = random_solution(rng, box)
+        side = box * box
+        cells = list(range(side * side))
+        rng.shuffle(cells)
+        for cell in cells:
+            row, col = divmod(cell, side)
+            num = puzzle[row][col]
+            puzzle[row][col] = 0
+            # Nothing grades harder than the top level, so hard puzzles skip the grading solve
+            if not proven_unique(puzzle) or (difficulty < HARDEST and grade_puzzle(puzzle)[0] > difficulty):
+                puzzle[row][col] = num
+        level = grade_puzzle(puzzle)[0]
+        if level == difficulty:
+            return puzzle
+        if best is None or abs(level - difficulty) < abs(best[0] - difficulty):
+            best = (level, puzzle)
+    return best[1]
+
+
+def main(argv=None):
+    # python -m sudoku_core [PUZZLE ...]: solve one-line puzzles given as arguments, or
+    # one per line on stdin, and print one solution (or "invalid" / "unsolvable") per line
+    puzzles = (argv if argv is not None else sys.argv[1:]) or sudoku_io.read_lines(sys.stdin)
+    for line in puzzles:
+        solution, code = SudokuSolver(line, verbose=False).solve()
+        if solution:
+            print(solution)
+        else:
+            print("invalid" if code == RESULT_INVALID else "unsolvable")
+
+
+if __name__ == "__main__":
+    main()
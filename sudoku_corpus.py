@@ -0,0 +1,157 @@
+import argparse
+import mmap
+import sys
+
+import sudoku_io
+
+# Binary puzzle corpora for collections too big to re-parse on every run. The format is
+# described in sudoku_io: a CORPUS_HEADER, then fixed-size records, so puzzle k is found
+# by arithmetic and a 9x9 corpus takes 41 bytes per puzzle against 82 for text.
+#
+#   python sudoku_corpus.py pack puzzles.txt puzzles.sdkb    text (lines, sdk or csv) to binary
+#   python sudoku_corpus.py unpack puzzles.sdkb -o out.txt   and back
+#   python batch.py puzzles.sdkb -w 8                        solve straight from the mapping
+#
+# Corpus maps the file read-only and hands out records as memoryview slices of the mapping,
+# which SudokuSolver accepts as puzzles, so nothing is copied or parsed until a solver loads
+# a record; the solver decodes it then and keeps no view, so the corpus can still be closed
+# while solvers are alive. Worker processes forked after the parent opened a corpus share its mapping, and
+# ones that open the file themselves share its pages through the OS page cache.
+
+
+class Corpus:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self.file.close()
+            raise ValueError(f"Not a puzzle corpus: {path}")
+        header = sudoku_io.CORPUS_HEADER
+        if len(self.map) < header.size:
+            self.close()
+            raise ValueError(f"Not a puzzle corpus: {path}")
+        magic, version, box, record_size, count = header.unpack_from(self.map)
+        if magic != sudoku_io.CORPUS_MAGIC or version != sudoku_io.CORPUS_VERSION or sudoku_io.RECORD_SIZES.get(box) != record_size:
+            self.close()
+            raise ValueError(f"Not a puzzle corpus: {path}")
+        if len(self.map) < header.size + count * record_size:
+            self.close()
+            raise ValueError(f"Truncated puzzle corpus: {path}")
+        self.box = box
+        self.record_size = record_size
+        self.count = count
+        self.view = memoryview(self.map)
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        # Puzzle index as a memoryview of its record, in O(1) and without copying
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"Corpus index out of range: {index}")
+        start = sudoku_io.CORPUS_HEADER.size + index * self.record_size
+        return self.view[start:start + self.record_size]
+
+    def records(self, start=0, stop=None):
+        for index in range(start, self.count if stop is None else min(stop, self.count)):
+            yield self.record(index)
+
+    def __getitem__(self, index):
+        # Puzzle index as a one-line string
+        return sudoku_io.unpack_record(self.record(index))
+
+    def __iter__(self):
+        return map(sudoku_io.unpack_record, self.records())
+
+    def close(self):
+        # Record views still held by the caller must be released first, or mmap refuses to
+        # close; SudokuSolver decodes a record on construction and keeps no view
+        if getattr(self, "view", None) is not None:
+            self.view.release()
+            self.view = None
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_corpus(path, puzzles):
+    # Pack one-line puzzles, all of one size, into a corpus file; returns how many were written.
+    # The count in the header is filled in at the end, so puzzles can be any iterable
+    header = sudoku_io.CORPUS_HEADER
+    box = None
+    count = 0
+    with open(path, "wb") as stream:
+        stream.write(bytes(header.size))
+        for puzzle in puzzles:
+            record = sudoku_io.pack_record(puzzle)
+            if box is None:
+                box = sudoku_io.RECORD_BOXES[len(record)]
+            elif len(record) != sudoku_io.RECORD_SIZES[box]:
+                raise ValueError(f"Puzzle {count} is not the size of the first one: {puzzle}")
+            stream.write(record)
+            count += 1
+        box = box or 3
+        stream.seek(0)
+        stream.write(header.pack(sudoku_io.CORPUS_MAGIC, sudoku_io.CORPUS_VERSION, box, sudoku_io.RECORD_SIZES[box], count))
+    return count
+
+
+_shared = {}
+
+
+def shared_corpus(path):
+    # One open Corpus per path and process, kept for the life of the process. A pool forked
+    # after the parent opened the corpus inherits it, mapping included
+    if path not in _shared:
+        _shared[path] = Corpus(path)
+    return _shared[path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert puzzles between text formats and the binary corpus format.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="text puzzles to a corpus")
+    pack.add_argument("input", help="puzzle file, or - for stdin")
+    pack.add_argument("output", help="corpus file to write")
+    pack.add_argument("-f", "--format", choices=sudoku_io.FORMATS, help="input format (default: from the file extension)")
+    unpack = commands.add_parser("unpack", help="a corpus to text puzzles")
+    unpack.add_argument("input", help="corpus file")
+    unpack.add_argument("-o", "--output", help="write puzzles here instead of stdout")
+    unpack.add_argument("--output-format", default="lines", choices=sudoku_io.FORMATS)
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        source = sudoku_io.open_input(args.input)
+        try:
+            count = write_corpus(args.output, sudoku_io.read_puzzles(source, args.format or sudoku_io.detect_format(args.input)))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(f"Packed {count} puzzles into {args.output}", file=sys.stderr)
+        return
+
+    with Corpus(args.input) as corpus:
+        target = sudoku_io.open_output(args.output)
+        try:
+            if args.output_format == "csv":
+                sudoku_io.write_csv(target, ((puzzle, None) for puzzle in corpus))
+            elif args.output_format == "sdk":
+                sudoku_io.write_sdk(target, corpus)
+            else:
+                sudoku_io.write_lines(target, corpus)
+        finally:
+            if target is not sys.stdout:
+                target.close()
+
+
+if __name__ == "__main__":
+    main()
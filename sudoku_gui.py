@@ -0,0 +1,542 @@
+# Tkinter front end. Imported only when one of the GUI modes is started.
+from collections import deque
+import copy
+from math import isqrt
+import queue
+import threading
+import tkinter as tk
+import tkinter.simpledialog as simpledialog
+from tkinter import messagebox
+
+from sudoku_core import (
+    CHAR_VALUES,
+    RESULT_ABORTED,
+    RESULT_INVALID,
+    VALUE_CHARS,
+    CancelToken,
+    StepTrace,
+    SudokuSolver,
+    generate_valid_puzzle,
+)
+from sudoku_session import MOVE_CONFLICT, MOVE_WRONG, PuzzleSession
+
+SOLVE_TIMEOUT = 10  # Seconds the solver thread gets before giving up
+PLAYBACK_SPEED = 2  # Placements shown per second when playback starts
+POLL_MS = 50  # How often playback checks the solver thread while it has nothing to show
+CANVAS_SIZE = 360  # Pixel width of the grid; cells shrink as the grid grows past 9x9
+
+
+def parse_entry(value, size):
+    # Digit typed into a cell (1-9, then A, B, ... on grids above 9x9), None if it is not one
+    num = CHAR_VALUES.get(value.strip()) if len(value.strip()) == 1 else None
+    return num if num and num <= size else None
+
+
+class SudokuGUI:
+    def __init__(self, master, puzzle):
+        self.master = master
+        self.puzzle = puzzle
+        self.initial = copy.deepcopy(puzzle)
+        self.size = len(puzzle)
+        self.box = isqrt(self.size)
+        self.cell_size = CANVAS_SIZE // self.size
+        
+        self.canvas = tk.Canvas(self.master, width=self.size * self.cell_size, height=self.size * self.cell_size)
+        self.canvas.pack()
+        
+        self.draw_grid()
+        self.draw_puzzle()
+
+        self.solve_button = tk.Button(self.master, text="Solve", command=self.solve)
+        self.solve_button.pack()
+
+    def draw_grid(self):
+        cell_size, length = self.cell_size, self.size * self.cell_size
+        for i in range(self.size + 1):
+            width = 2 if i % self.box == 0 else 1
+            self.canvas.create_line(i * cell_size, 0, i * cell_size, length, width=width)
+            self.canvas.create_line(0, i * cell_size, length, i * cell_size, width=width)
+
+    def draw_puzzle(self):
+        for i in range(self.size):
+            for j in range(self.size):
+                if self.puzzle[i][j] != 0:
+                    x = j * self.cell_size + self.cell_size // 2
+                    y = i * self.cell_size + self.cell_size // 2
+                    self.canvas.create_text(x, y, text=VALUE_CHARS[self.puzzle[i][j]], font=('Arial', self.cell_size * 2 // 5, 'bold'))
+
+    def solve(self):
+        # The solver runs on a worker thread and streams its steps through a queue, so the
+        # playback window opens at once and the Tk thread never waits on the search
+        self.master.withdraw()  # Hide the current GUI
+        steps_queue = queue.SimpleQueue()
+        solver = SudokuSolver(copy.deepcopy(self.puzzle), stats=True)
+        solver.steps = StreamingTrace(solver.geo, steps_queue)
+        cancel = CancelToken()
+        threading.Thread(target=run_solver, args=(solver, steps_queue, cancel), daemon=True).start()
+        solution_gui = SolutionGUI(self.initial, solver.steps, steps_queue, cancel)
+        solution_gui.show()
+
+
+class StreamingTrace(StepTrace):
+    # Step trace that also hands every packed step to the GUI as soon as the solver records it
+    def __init__(self, geo, steps_queue):
+        super().__init__("full", geo)
+        self.steps_queue = steps_queue
+
+    def add(self, cell, num, mask, rule):
+        super().add(cell, num, mask, rule)
+        self.steps_queue.put(self.words[-1])
+
+
+def run_solver(solver, steps_queue, cancel):
+    # Body of the solver thread; the (solution, code) tuple after the last step marks the end
+    solution, code = solver.solve(timeout=SOLVE_TIMEOUT, cancel=cancel)
+    stats = solver.stats
+    time_taken = sum(stats.timings_ns.values()) / 1e6  # Convert to milliseconds
+    print(f"Time taken to solve puzzle: {time_taken:.3f} milliseconds "
+          f"({stats.nodes} nodes, {stats.backtracks} backtracks, {stats.reductions} reductions)")
+    steps_queue.put((solution, code))
+
+
+class SolutionGUI:
+    def __init__(self, initial_puzzle, trace, steps_queue, cancel=None):
+        self.initial_puzzle = initial_puzzle
+        self.trace = trace  # Decodes the packed steps arriving on steps_queue
+        self.steps_queue = steps_queue
+        self.cancel = cancel  # Stops the solver thread if the window is closed early
+        self.pending = deque()  # Steps received from the solver thread but not shown yet
+        self.outcome = None  # (solution, code) once the solver thread has finished
+        self.paused = False
+        self.skipping = False  # Show every remaining step at once
+        self.current_puzzle = [row[:] for row in initial_puzzle]  # Copy of the initial puzzle
+        self.size = len(initial_puzzle)
+        self.box = isqrt(self.size)
+        self.cell_size = CANVAS_SIZE // self.size
+        self.font = ('Arial', self.cell_size * 2 // 5, 'bold')
+        self.cell_items = {}  # (row, col) -> canvas text of the digit in that cell
+        self.highlight = None  # Cell of the latest placement, drawn in red
+        self.domain_item = None  # Candidates of the latest placement
+        self.after_id = None
+
+        self.root = tk.Tk()
+        self.root.title("Solution Steps")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.canvas = tk.Canvas(self.root, width=self.size * self.cell_size, height=self.size * self.cell_size)
+        self.canvas.pack()
+
+        controls = tk.Frame(self.root)
+        controls.pack()
+        self.pause_button = tk.Button(controls, text="Pause", command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT)
+        self.skip_button = tk.Button(controls, text="Skip", command=self.skip)
+        self.skip_button.pack(side=tk.LEFT)
+        self.speed = tk.Scale(controls, from_=1, to=100, orient=tk.HORIZONTAL, label="Steps per second")
+        self.speed.set(PLAYBACK_SPEED)
+        self.speed.pack(side=tk.LEFT)
+
+        self.draw_grid()
+        self.draw_puzzle(self.current_puzzle)
+        self.after_id = self.root.after(0, self.play)
+
+    def draw_grid(self):
+        cell_size, length = self.cell_size, self.size * self.cell_size
+        for i in range(self.size + 1):
+            width = 2 if i % self.box == 0 else 1
+            self.canvas.create_line(i * cell_size, 0, i * cell_size, length, width=width)
+            self.canvas.create_line(0, i * cell_size, length, i * cell_size, width=width)
+
+    def receive(self):
+        # Move everything the solver thread has queued so far into pending
+        while True:
+            try:
+                item = self.steps_queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, tuple):
+                self.outcome = item
+            else:
+                self.pending.append(item)
+
+    def play(self):
+        # One playback tick: apply steps up to and including the next placement, redraw only
+        # the cells they changed and schedule the next tick
+        self.receive()
+        if self.outcome is not None and not self.outcome[0]:
+            self.finish()  # No solution, so there is nothing worth replaying
+            return
+        placed = None
+        if not self.paused:
+            changed = set()
+            while self.pending:
+                row, col, num, dom, rule = self.trace.decode(self.pending.popleft())
+                if self.current_puzzle[row][col] != num:
+                    self.current_puzzle[row][col] = num  # Update the current puzzle state
+                    changed.add((row, col))
+                if num != 0:
+                    placed = (row, col, dom, rule)
+                    if not self.skipping:
+                        break
+                elif placed and placed[:2] == (row, col):
+                    placed = None  # Backtracked within the same tick
+            for row, col in changed:
+                self.draw_cell(row, col)
+            if placed:
+                self.show_placement(*placed)
+        if self.outcome is not None and not self.pending:
+            self.finish()
+            return
+        delay = 1000 // self.speed.get() if placed else POLL_MS
+        self.after_id = self.root.after(delay, self.play)
+
+    def draw_cell(self, row, col, colour='black'):
+        item = self.cell_items.pop((row, col), None)
+        if item is not None:
+            self.canvas.delete(item)
+        num = self.current_puzzle[row][col]
+        if num:
+            x = col * self.cell_size + self.cell_size // 2
+            y = row * self.cell_size + self.cell_size // 2
+            self.cell_items[(row, col)] = self.canvas.create_text(x, y, text=VALUE_CHARS[num], font=self.font, fill=colour)
+
+    def show_placement(self, row, col, dom, rule):
+        # Latest digit in red with its candidates underneath; the previous one goes back to black
+        if self.highlight in self.cell_items and self.highlight != (row, col):
+            self.canvas.itemconfig(self.cell_items[self.highlight], fill='black')
+        self.highlight = (row, col)
+        self.canvas.itemconfig(self.cell_items[(row, col)], fill='red')
+        if self.domain_item is not None:
+            self.canvas.delete(self.domain_item)
+        x = col * self.cell_size + self.cell_size // 2
+        y = row * self.cell_size + self.cell_size
+        domain_text = ", ".join(VALUE_CHARS[num] for num in sorted(dom))
+        self.domain_item = self.canvas.create_text(x, y, text=domain_text, font=('Arial', max(self.cell_size // 4, 6)), fill='blue')
+        self.root.title(f"Solution Steps - {rule}")  # Show which rule or guess placed the digit
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        self.pause_button.config(text="Resume" if self.paused else "Pause")
+
+    def skip(self):
+        self.skipping = True
+        self.paused = False
+        self.pause_button.config(text="Pause", state="disabled")
+
+    def finish(self):
+        solution, code = self.outcome
+        if solution:
+            self.root.title("Solution Steps - solved")
+            self.after_id = self.root.after(1000, self.return_to_mode_selection)
+            return
+        if code == RESULT_INVALID:
+            messagebox.showerror("Warning", "Invalid Sudoku Puzzle")
+        elif code == RESULT_ABORTED:
+            messagebox.showerror("Warning", f"Gave up after {SOLVE_TIMEOUT} seconds without a solution")
+        else:
+            messagebox.showerror("Warning", "No Solution Exists !")
+        self.return_to_mode_selection()
+
+    def draw_puzzle(self, puzzle):
+        for i in range(self.size):
+            for j in range(self.size):
+                if puzzle[i][j] != 0:
+                    self.draw_cell(i, j)
+
+    def show(self):
+        self.root.mainloop()
+
+    def close(self):
+        # Window closed mid-playback: stop the solver thread as well
+        if self.cancel is not None:
+            self.cancel.cancel()
+        self.return_to_mode_selection()
+
+    def return_to_mode_selection(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+        self.root.destroy()  # Close the current GUI
+        mode_selection_gui = ModeSelectionGUI()
+        mode_selection_gui.root.mainloop()
+
+class ModeSelectionGUI:
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("Mode Selection")
+
+        self.mode_label = tk.Label(self.root, text="Select a mode:")
+        self.mode_label.pack()
+
+        self.mode1_button = tk.Button(self.root, text="Mode 1", command=self.mode1)
+        self.mode1_button.pack()
+
+        self.mode2_button = tk.Button(self.root, text="Mode 2", command=self.mode2)
+        self.mode2_button.pack()
+
+        self.mode3_button = tk.Button(self.root, text="Mode 3", command=self.mode3)
+        self.mode3_button.pack()
+
+    def mode1(self):
+        self.root.destroy()  # Close the current GUI
+        main(mode=1)  # Start the main function with mode 1
+
+    def mode2(self):
+        self.root.destroy()  # Close the current GUI
+        main(mode=2)  # Start the main function with mode 2
+
+    def mode3(self):
+        self.root.destroy()  # Close the current GUI
+        main(mode=3)  # Start the main function with mode 3
+    
+class SudokuInputGUI:
+    def __init__(self, master, puzzle):
+        self.master = master
+        self.puzzle = puzzle
+        self.size = len(puzzle)
+        self.box = isqrt(self.size)
+        
+        # Calculate the total width and height of the canvas based on the grid size
+        cell_size = CANVAS_SIZE // self.size
+        canvas_width = canvas_height = cell_size * self.size
+
+        self.canvas = tk.Canvas(self.master, width=canvas_width, height=canvas_height)
+        self.canvas.pack()
+        
+        self.draw_grid(cell_size)
+
+        self.save_button = tk.Button(self.master, text="Save", command=self.save_puzzle)
+        self.save_button.pack()
+
+    def draw_grid(self, cell_size):
+        for i in range(self.size + 1):
+            width = 2 if i % self.box == 0 else 1
+            self.canvas.create_line(i * cell_size, 0, i * cell_size, self.size * cell_size, width=width)
+            self.canvas.create_line(0, i * cell_size, self.size * cell_size, i * cell_size, width=width)
+
+    def save_puzzle(self):
+        # Save the puzzle from user input
+        for i in range(self.size):
+            for j in range(self.size):
+                num = parse_entry(self.entries[i][j].get(), self.size)
+                if num:
+                    self.puzzle[i][j] = num
+
+        # Close the input GUI
+        self.master.destroy()
+
+    def show(self):
+        cell_size = CANVAS_SIZE // self.size
+        self.entries = [[None for _ in range(self.size)] for _ in range(self.size)]
+        for i in range(self.size):
+            for j in range(self.size):
+                x = j * cell_size + cell_size // 2
+                y = i * cell_size + cell_size // 2
+                self.entries[i][j] = tk.Entry(self.master, width=2, font=('Arial', cell_size * 2 // 5, 'bold'))
+                self.entries[i][j].place(x=x, y=y, anchor="center")
+
+        self.master.mainloop()
+
+
+class UserInteractiveSudokuGUI:
+    def __init__(self, master, initial_puzzle):
+        self.master = master
+        self.initial_puzzle = initial_puzzle
+        self.current_puzzle = [row[:] for row in initial_puzzle]  # Copy of the initial puzzle
+        self.size = len(initial_puzzle)
+        self.box = isqrt(self.size)
+        self.cell_size = CANVAS_SIZE // self.size
+        self.entries = [[None for _ in range(self.size)] for _ in range(self.size)]  # Store references to the entry widgets
+        self.session = PuzzleSession(initial_puzzle)  # Solved once here; every Enter is checked against it
+
+        self.canvas = tk.Canvas(self.master, width=self.size * self.cell_size, height=self.size * self.cell_size)
+        self.canvas.pack()
+
+        self.draw_grid()
+        self.draw_puzzle()
+
+        self.enter_button = tk.Button(self.master, text="Enter", command=self.check_solvable)
+        self.enter_button.pack()
+        self.hint_button = tk.Button(self.master, text="Hint", command=self.show_hint)
+        self.hint_button.pack()
+
+    def draw_grid(self):
+        cell_size, length = self.cell_size, self.size * self.cell_size
+        for i in range(self.size + 1):
+            width = 2 if i % self.box == 0 else 1
+            self.canvas.create_line(i * cell_size, 0, i * cell_size, length, width=width)
+            self.canvas.create_line(0, i * cell_size, length, i * cell_size, width=width)
+
+    def highlight(self, cells, colour="red"):
+        # Outline cells until the next Enter or hint
+        for row, col in cells:
+            x, y = col * self.cell_size, row * self.cell_size
+            self.canvas.create_rectangle(x + 2, y + 2, x + self.cell_size - 2, y + self.cell_size - 2, outline=colour, width=2, tags="highlight")
+
+    def draw_puzzle(self):
+        #self.entries = [[None for _ in range(self.size)] for _ in range(self.size)]
+        for i in range(self.size):
+            for j in range(self.size):
+                x = j * self.cell_size + self.cell_size // 2
+                y = i * self.cell_size + self.cell_size // 2
+                font = ('Arial', self.cell_size * 2 // 5, 'bold')
+                if self.current_puzzle[i][j] == 0:
+                    # Create an entry for user input
+                    entry = tk.Entry(self.master, width=2, font=font)
+                    entry.place(x=x, y=y, anchor="center")
+                    setattr(self, f"entry_{i}_{j}", entry)  # Store the entry in an attribute with a specific name
+                    self.entries[i][j] = entry  # Also store the entry in the list
+                else:
+                    # Display the initial value
+                    self.canvas.create_text(x, y, text=VALUE_CHARS[self.current_puzzle[i][j]], font=font)
+
+
+    def check_solvable(self):
+        # Each new entry costs a bitmask lookup and a comparison with the session's cached
+        # solution, not a solve. The first bad entry rejects this round's entries and
+        # outlines the cells involved
+        self.canvas.delete("highlight")
+        placed = []
+        for i in range(self.size):
+            for j in range(self.size):
+                entry = getattr(self, f"entry_{i}_{j}", None)
+                if not entry or not entry.get() or self.current_puzzle[i][j]:
+                    continue
+                num = parse_entry(entry.get(), self.size)
+                if not num:
+                    # If any entry is not a valid digit, show an error message
+                    self.undo_entries(placed)
+                    messagebox.showerror("Error", "Invalid input!")
+                    return
+                outcome = self.session.place(i, j, num)
+                if outcome == MOVE_CONFLICT:
+                    self.undo_entries(placed)
+                    self.highlight([(i, j)] + self.session.conflicts(i, j, num))
+                    messagebox.showerror("Error", "Invalid Sudoku puzzle!")
+                    return
+                if outcome == MOVE_WRONG:
+                    self.undo_entries(placed)
+                    self.highlight([(i, j)])
+                    messagebox.showerror("Unsolvable", "Puzzle is unsolvable!")
+                    return
+                placed.append((i, j))
+
+        self.current_puzzle = self.session.puzzle()
+        if self.session.is_complete():
+            messagebox.showinfo("Congratulations", "Great Job!")
+            self.return_to_mode_selection()
+            return
+        self.reset_gui()
+
+    def undo_entries(self, cells):
+        for row, col in cells:
+            self.session.clear(row, col)
+
+    def show_hint(self):
+        # Type the answer for the easiest empty cell into its entry; Enter still confirms it
+        self.canvas.delete("highlight")
+        hint = self.session.hint()
+        if hint is None:
+            return
+        row, col, num = hint
+        entry = getattr(self, f"entry_{row}_{col}")
+        entry.delete(0, "end")
+        entry.insert(0, VALUE_CHARS[num])
+        self.highlight([(row, col)], "green")
+
+    def reset_gui(self):
+
+            # Update the existing entry widgets with the new puzzle values
+        for i in range(self.size):
+            for j in range(self.size):
+                entry = getattr(self, f"entry_{i}_{j}", None)
+                if entry:
+                    if self.current_puzzle[i][j] == 0:
+                        entry.config(state="normal")  # Enable the entry widget
+                    else:
+                        entry.delete(0, "end")  # Clear the entry widget
+                        entry.insert(0, VALUE_CHARS[self.current_puzzle[i][j]])  # Insert the new value
+                        entry.config(state="readonly")  # Disable the entry widget for initial values
+
+        # Clear the entries list
+        self.entries = [[None for _ in range(self.size)] for _ in range(self.size)]
+
+    def return_to_mode_selection(self):
+        self.master.destroy()  # Close the current GUI
+        mode_selection_gui = ModeSelectionGUI()
+        mode_selection_gui.root.mainloop()
+
+
+
+
+def mode3_handler(initial_puzzle):
+    root = tk.Tk()
+    root.title("User Interactive Sudoku")
+
+    user_sudoku_gui = UserInteractiveSudokuGUI(root, initial_puzzle)
+    root.mainloop()
+
+# Inside the function where you print "Mode 3 selected"
+def select_difficulty():
+    root = tk.Tk()
+    root.withdraw()  # Hide the root window
+
+    # Prompt the user to select the difficulty level
+    difficulty = simpledialog.askstring("Difficulty Selection", "Choose difficulty level (easy, medium, hard):")
+    
+    # Check the selected difficulty level
+    if difficulty.lower() == "easy":
+        print("Easy mode selected")
+        return 1
+
+    elif difficulty.lower() == "medium":
+        print("Medium mode selected")
+        return 2
+
+    elif difficulty.lower() == "hard":
+        print("Hard mode selected")
+        return 3
+
+    else:
+        print("Invalid difficulty level selected")
+        return 0
+
+
+def main(mode):
+    if mode == 1:
+        print("Mode 1 selected")
+        #puzzle = generate_valid_puzzle(0)
+        mode = select_difficulty()
+        puzzle = generate_valid_puzzle(mode)
+        root = tk.Tk()
+        root.title("Sudoku Solver")
+        SudokuGUI(root, puzzle)
+        root.mainloop()
+    elif mode == 2:
+        print("Mode 2 selected")
+                # Create an empty puzzle
+        puzzle = [[0] * 9 for _ in range(9)]
+
+        # Open GUI for the user to input initial state
+        root = tk.Tk()
+        root.title("Sudoku Initial State Input")
+
+        sudoku_input_gui = SudokuInputGUI(root, puzzle)
+        sudoku_input_gui.show()
+        root = tk.Tk()
+        root.title("Sudoku Solver")
+        SudokuGUI(root, puzzle)
+        root.mainloop()
+
+    elif mode == 3:
+        print("Mode 3 selected")
+        mode = select_difficulty()
+        puzzle = generate_valid_puzzle(mode)
+        mode3_handler(puzzle)
+
+def run():
+    mode_selection_gui = ModeSelectionGUI()
+    mode_selection_gui.root.mainloop()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,131 @@
+import csv
+from math import isqrt
+import struct
+import sys
+
+# Streaming readers and writers for the common text formats. Readers are generators that
+# hold one puzzle at a time and yield one-line strings, which SudokuSolver loads straight
+# into its flat grid. Digits are 1-9, then A-G on 16x16 and A-P on 25x25; blanks may be
+# written as 0 or .
+#
+#   lines  one puzzle per line; a 256 or 625 character first field is a 16x16 or 25x25
+#          puzzle, otherwise anything after the first 81 characters is ignored
+#   sdk    9 rows of 9 characters per puzzle; # comments and | - + separators are skipped
+#   csv    puzzle,solution rows (the solution column is optional), with or without a header
+#
+# Binary corpora (.sdkb, read through sudoku_corpus.Corpus) are a header followed by one
+# fixed-size record per puzzle, so puzzle k starts at CORPUS_HEADER.size + k * record size
+# and no separate index is needed. 9x9 cells are packed two per byte, high nibble first,
+# which is 41 bytes with one nibble of padding; 16x16 and 25x25 cells take a byte each.
+
+CELL_CHARS = frozenset("0123456789.")
+LARGE_CELL_CHARS = CELL_CHARS | frozenset("ABCDEFGHIJKLMNOPabcdefghijklmnop")
+PUZZLE_LENGTHS = (81, 256, 625)  # 9x9, 16x16 and 25x25
+FORMATS = ("lines", "sdk", "csv")
+CORPUS_EXTENSION = ".sdkb"
+CORPUS_MAGIC = b"SDKC"
+CORPUS_VERSION = 1
+CORPUS_HEADER = struct.Struct("<4sBBHQ")  # Magic, version, box width, record size, puzzle count
+RECORD_SIZES = {3: 41, 4: 256, 5: 625}  # Box width -> bytes per puzzle record
+RECORD_BOXES = {size: box for box, size in RECORD_SIZES.items()}
+CHAR_RECORDS = bytes.maketrans(b"0123456789ABCDEFGHIJKLMNOP", bytes(range(26)))  # Cell character -> record byte
+RECORD_CHARS = bytes.maketrans(bytes(range(26)), b"0123456789ABCDEFGHIJKLMNOP")
+
+
+def open_input(path):
+    # "-" means stdin
+    return sys.stdin if path == "-" else open(path, newline="")
+
+
+def open_output(path):
+    return sys.stdout if path in (None, "-") else open(path, "w", newline="")
+
+
+def detect_format(path):
+    if path.endswith(".sdk"):
+        return "sdk"
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith(CORPUS_EXTENSION):
+        return "corpus"
+    return "lines"
+
+
+def read_lines(stream):
+    for line in stream:
+        line = line.strip()
+        if len(line) < 81 or line[0] == "#":
+            continue
+        field = line.split(None, 1)[0]
+        yield field if len(field) in PUZZLE_LENGTHS[1:] else line[:81]
+
+
+def read_sdk(stream):
+    cells = []
+    for line in stream:
+        if line.startswith("#"):
+            continue
+        cells.extend(char for char in line if char in CELL_CHARS)
+        if len(cells) >= 81:
+            yield "".join(cells[:81])
+            del cells[:81]
+
+
+def read_csv(stream):
+    # Yields (puzzle, solution) pairs; solution is None when the file has no second column
+    for row in csv.reader(stream):
+        if not row or len(row[0]) not in PUZZLE_LENGTHS or not LARGE_CELL_CHARS.issuperset(row[0]):
+            continue  # Header or blank line
+        solution = row[1] if len(row) > 1 and len(row[1]) == len(row[0]) else None
+        yield row[0], solution
+
+
+def read_puzzles(stream, fmt="lines"):
+    # Puzzle strings only, whatever the format
+    if fmt == "lines":
+        return read_lines(stream)
+    if fmt == "sdk":
+        return read_sdk(stream)
+    if fmt == "csv":
+        return (puzzle for puzzle, _ in read_csv(stream))
+    raise ValueError(f"Unknown puzzle format: {fmt}")
+
+
+def write_lines(stream, puzzles):
+    for puzzle in puzzles:
+        stream.write(puzzle)
+        stream.write("\n")
+
+
+def write_sdk(stream, puzzles):
+    # Written row by row at any size, though read_sdk only reads 9x9 back
+    for puzzle in puzzles:
+        side = isqrt(len(puzzle))
+        for row in range(side):
+            stream.write(puzzle[row * side:row * side + side].replace("0", "."))
+            stream.write("\n")
+        stream.write("\n")
+
+
+def write_csv(stream, pairs, header=True):
+    writer = csv.writer(stream, lineterminator="\n")
+    if header:
+        writer.writerow(("puzzle", "solution"))
+    for puzzle, solution in pairs:
+        writer.writerow((puzzle, solution or ""))
+
+
+def pack_record(puzzle):
+    # Corpus record of a one-line puzzle
+    if len(puzzle) == 81 and CELL_CHARS.issuperset(puzzle):
+        return bytes.fromhex(puzzle.replace(".", "0") + "0")
+    if len(puzzle) in PUZZLE_LENGTHS[1:] and LARGE_CELL_CHARS.issuperset(puzzle):
+        return puzzle.upper().replace(".", "0").encode("ascii").translate(CHAR_RECORDS)
+    raise ValueError(f"Not a one-line puzzle: {puzzle[:81]}")
+
+
+def unpack_record(record):
+    # One-line puzzle of a corpus record (bytes or a memoryview)
+    if len(record) == RECORD_SIZES[3]:
+        return record.hex()[:81]
+    return bytes(record).translate(RECORD_CHARS).decode("ascii")
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import itertools
+import sys
+import time
+from collections import Counter, deque
+
+import sudoku_io
+from bench import percentile
+
+# Load generator for sudoku_server. Opens several connections, keeps a window of puzzles
+# in flight on each and reports throughput and latency percentiles.
+#
+#   python sudoku_server.py --port 8765 &
+#   python sudoku_loadgen.py bench_data/hardest.txt -n 2000 -c 8 --window 16
+
+
+async def run_connection(puzzles, latencies, outcomes, args):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    window = asyncio.Semaphore(args.window)
+    sent = deque()  # Send times of unanswered puzzles; answers come back in order
+    suffix = f" {args.deadline}\n" if args.deadline else "\n"
+
+    async def send():
+        for puzzle in puzzles:
+            await window.acquire()
+            sent.append(time.perf_counter())
+            writer.write(puzzle.encode("ascii") + suffix.encode("ascii"))
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for _ in range(len(puzzles)):
+        line = await reader.readline()
+        if not line:
+            break
+        latencies.append(time.perf_counter() - sent.popleft())
+        answer = line.decode("ascii").strip()
+        outcomes["solved" if len(answer) in sudoku_io.PUZZLE_LENGTHS else answer] += 1
+        window.release()
+    if not sender.done():  # The server hung up early
+        sender.cancel()
+    await asyncio.gather(sender, return_exceptions=True)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(args):
+    with open(args.puzzles) as stream:
+        corpus = list(sudoku_io.read_puzzles(stream, args.format or sudoku_io.detect_format(args.puzzles)))
+    if not corpus:
+        raise ValueError(f"No puzzles in {args.puzzles}")
+    total = args.count or len(corpus)
+    requests = list(itertools.islice(itertools.cycle(corpus), total))
+    # Round-robin split, so every connection sees a similar mix
+    shares = [requests[index::args.connections] for index in range(args.connections)]
+    latencies = []
+    outcomes = Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(run_connection(share, latencies, outcomes, args) for share in shares if share))
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(latencies)} requests in {elapsed:.2f} s ({len(latencies) / max(elapsed, 1e-9):.0f} requests/s)")
+    if latencies:
+        print("latency ms: " + "  ".join(
+            f"{name} {percentile(latencies, fraction) * 1000:.2f}"
+            for name, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("max", 1.0))
+        ))
+    print("results: " + ", ".join(f"{name} {count}" for name, count in sorted(outcomes.items())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure throughput and latency of sudoku_server.")
+    parser.add_argument("puzzles", help="puzzle file, reused round-robin until --count requests are sent")
+    parser.add_argument("-f", "--format", choices=sudoku_io.FORMATS, help="input format (default: from the file extension)")
+    parser.add_argument("-n", "--count", type=int, default=None, help="requests to send (default: one per puzzle)")
+    parser.add_argument("-c", "--connections", type=int, default=4)
+    parser.add_argument("--window", type=int, default=8, help="unanswered requests per connection")
+    parser.add_argument("--deadline", type=float, default=None, help="per-request deadline in seconds")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run(args))
+    except ConnectionError as error:
+        print(f"Cannot reach the server: {error}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
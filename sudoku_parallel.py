@@ -0,0 +1,201 @@
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import multiprocessing
+import os
+import sys
+import time
+
+from sudoku_core import (
+    CHAR_VALUES,
+    RESULT_ABORTED,
+    RESULT_INVALID,
+    RESULT_UNSOLVABLE,
+    VALUE_CHARS,
+    SudokuSolver,
+    mask_to_values,
+    puzzle_string,
+)
+
+# One puzzle solved on several cores. Two strategies:
+#
+#   split      propagate, branch on the most constrained cell and repeat on the children
+#              until there are SPLIT_FACTOR subproblems per worker, then solve the subtrees
+#              in a process pool. Workers take the next subtree as soon as they finish one,
+#              so a worker whose subtree dies early picks up the remaining work
+#   portfolio  run differently configured solvers (PORTFOLIO) on the whole puzzle
+#
+# The first worker to find a solution wins: a multiprocessing Event shared by the pool is
+# set, every other worker sees it through the solver's cancel check and stops, and queued
+# tasks are dropped. solve() returns the usual (puzzle, steps) pair, where steps is the
+# winning worker's trace (empty if splitting itself finished the puzzle), and self.winner
+# names the subtree or configuration that won. With several solutions the winner's may
+# differ from the one a serial solve finds first.
+#
+#   python sudoku_parallel.py PUZZLE -w 8 --strategy portfolio
+
+SPLIT_FACTOR = 4  # Subproblems per worker, so idle workers have something to take
+MAX_SPLIT_DEPTH = 6  # Branching levels explored before giving up on reaching the target
+POLL_SECONDS = 0.05  # How often solve() checks its own timeout and cancel token
+STRATEGIES = ("split", "portfolio")
+# Configurations raced by the portfolio strategy, strongest on typical hard puzzles first
+PORTFOLIO = {
+    "dlx": {"backend": "dlx"},
+    "mrv/full": {"var_order": "mrv", "propagation": "full"},
+    "mrv+lcv/full": {"var_order": "mrv", "value_order": "lcv", "propagation": "full"},
+    "mrv-degree/singles": {"var_order": "mrv-degree", "propagation": "singles"},
+}
+
+_stop = None  # The pool's shared Event, set in each worker by init_worker
+
+
+def init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def solve_task(puzzle, options, timeout):
+    # Runs in a worker: the usual solve() result, with the shared Event as cancel token
+    if _stop.is_set():
+        return False, RESULT_ABORTED
+    return SudokuSolver(puzzle, verbose=False, **options).solve(timeout, cancel=_stop)
+
+
+def branch(puzzle, propagation="full"):
+    # (solution, children) of a one-line puzzle: the solution if propagation alone finishes
+    # it, otherwise (label, puzzle) for every candidate of the most constrained cell. No
+    # children means a dead end
+    solver = SudokuSolver(puzzle, verbose=False, trace="off", propagation=propagation)
+    solver.initializeDomains()
+    if not solver.propagate():
+        return None, []
+    cell = solver.select_mrv()
+    if cell is None:
+        return solver.result(), []
+    row, col = divmod(cell, solver.size)
+    children = []
+    for num in mask_to_values(solver.candidates[cell]):
+        solver.grid[cell] = num
+        children.append((f"r{row + 1}c{col + 1}={VALUE_CHARS[num]}", "".join(VALUE_CHARS[value] for value in solver.grid)))
+    return None, children
+
+
+def split_puzzle(puzzle, target, propagation="full"):
+    # (found, subproblems): breadth-first branching until there are at least target
+    # subproblems, each a (label, puzzle) pair. A solution found on the way ends the split
+    # with found = (label, solution)
+    frontier = [("root", puzzle)]
+    for _ in range(MAX_SPLIT_DEPTH):
+        if len(frontier) >= target:
+            break
+        expanded = []
+        for label, subproblem in frontier:
+            solution, children = branch(subproblem, propagation)
+            if solution:
+                return (label, solution), []
+            expanded.extend((child if label == "root" else f"{label}, {child}", text) for child, text in children)
+        if not expanded:
+            return None, []
+        frontier = expanded
+    return None, frontier
+
+
+class ParallelSolver:
+    def __init__(self, puzzle, workers=None, strategy="split", portfolio=None, verbose=True, **options):
+        # options are SudokuSolver options, used by every split worker; the portfolio
+        # strategy runs the configurations in portfolio (default PORTFOLIO) instead, each
+        # with options as defaults
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown parallel strategy: {strategy}")
+        self.puzzle = puzzle
+        self.workers = workers or os.cpu_count() or 1
+        self.strategy = strategy
+        self.portfolio = portfolio or PORTFOLIO
+        self.verbose = verbose
+        self.options = options
+        self.winner = None  # Label of the subtree or configuration that found the solution
+        self.subproblems = 0  # Tasks handed to the pool by the last solve()
+
+    def solve(self, timeout=None, cancel=None):
+        # Same return values as SudokuSolver.solve(); timeout and cancel cover the whole
+        # parallel solve
+        self.winner = None
+        self.subproblems = 0
+        checker = SudokuSolver(self.puzzle, **dict(self.options, verbose=False, trace="off"))
+        if not checker.is_valid():
+            if self.verbose:
+                print("Invalid Sudoku puzzle.")
+            return False, RESULT_INVALID
+        text = self.puzzle if isinstance(self.puzzle, str) else puzzle_string(self.puzzle)
+
+        if self.strategy == "portfolio":
+            tasks = [(name, text, dict(self.options, **options)) for name, options in self.portfolio.items()]
+        else:
+            found, subproblems = split_puzzle(text, self.workers * SPLIT_FACTOR, self.options.get("propagation", "full"))
+            if found:
+                self.winner = found[0]
+                if self.winner == "root":  # Propagation alone solves it; a serial solve also gives the steps
+                    return SudokuSolver(self.puzzle, verbose=self.verbose, **self.options).solve(timeout, cancel=cancel)
+                return self.filled(checker, found[1]), checker.steps  # No search ran, so no steps
+            tasks = [(label, subproblem, self.options) for label, subproblem in subproblems]
+        if not tasks:
+            if self.verbose:
+                print("No solution exists.")
+            return False, RESULT_UNSOLVABLE
+        self.subproblems = len(tasks)
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        stop = multiprocessing.get_context().Event()
+        aborted = False
+        proved = False  # A portfolio member showed there is no solution
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), initializer=init_worker, initargs=(stop,)) as pool:
+            pending = {pool.submit(solve_task, subproblem, options, timeout): label for label, subproblem, options in tasks}
+            try:
+                while pending and not proved:
+                    done, _ = wait(pending, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        label = pending.pop(future)
+                        solution, outcome = future.result()  # outcome is the steps when solved, else a RESULT_* code
+                        if solution:
+                            self.winner = label
+                            return self.filled(checker, solution), outcome
+                        if outcome == RESULT_ABORTED:
+                            aborted = True
+                        elif self.strategy == "portfolio":
+                            proved = True  # One configuration proving it unsolvable is enough
+                    if (deadline is not None and time.monotonic() > deadline) or (cancel is not None and cancel.is_set()):
+                        aborted = True
+                        break
+            finally:
+                stop.set()  # Stops the running workers; queued tasks see it and return at once
+                for future in pending:
+                    future.cancel()
+        if aborted and not proved:
+            return False, RESULT_ABORTED
+        if self.verbose:
+            print("No solution exists.")
+        return False, RESULT_UNSOLVABLE
+
+    def filled(self, checker, solution):
+        # The one-line solution in the shape the puzzle was given in
+        checker.grid = [CHAR_VALUES[char] for char in solution]
+        return checker.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve one hard Sudoku puzzle on several cores.")
+    parser.add_argument("puzzle", help="one-line puzzle, 0 or . for blanks")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--strategy", default="split", choices=STRATEGIES)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds before giving up")
+    args = parser.parse_args(argv)
+    solver = ParallelSolver(args.puzzle, args.workers, args.strategy, trace="off")
+    start = time.perf_counter()
+    solution, _ = solver.solve(args.timeout)
+    elapsed = time.perf_counter() - start
+    if solution:
+        print(solution)
+    print(f"{elapsed:.3f} s, {solver.subproblems} tasks, winner: {solver.winner}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
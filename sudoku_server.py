@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import sudoku_io
+from batch import INVALID, TIMEOUT, solve_line
+from sudoku_core import BACKENDS, PROPAGATION_LEVELS, VALUE_ORDERINGS, VARIABLE_ORDERINGS
+
+# Line-oriented solve service. A client sends one puzzle per line, optionally followed by a
+# deadline in seconds ("PUZZLE 0.5"), and gets one line back per puzzle in the order sent:
+# the solution, or "invalid" / "unsolvable" / "timeout", or "busy" when the server's queue
+# is full. The line "stats" returns the server counters as JSON.
+#
+#   python sudoku_server.py --port 8765             TCP on 127.0.0.1:8765
+#   python sudoku_server.py --unix /tmp/sudoku.sock Unix socket
+#
+# Solves run on a process pool, so the event loop only parses lines and writes answers.
+# Identical puzzles in flight at the same time share one solve, which times out with the
+# deadline of the request that started it; a request with a longer deadline starts a fresh
+# solve that later requests join instead. Each connection may have
+# at most max_pipeline unanswered puzzles; past that the server stops reading from it,
+# which pushes back on the client through TCP flow control.
+
+BUSY = "busy"
+ERROR = "error"
+
+
+class SolveServer:
+    def __init__(self, workers=None, queue_size=1024, deadline=5.0, max_pipeline=64, **options):
+        if queue_size < 1:
+            raise ValueError(f"Queue size must be positive: {queue_size}")
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self.queue_size = queue_size  # Distinct puzzles solving or waiting for a worker
+        self.deadline = deadline  # Longest a request may wait
+        self.max_pipeline = max_pipeline
+        self.options = options
+        self.inflight = {}  # Puzzle -> (future, timeout) of its solve, shared by identical requests
+        self.requests = 0
+        self.solves = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path=path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        # Requests are answered concurrently but written back in arrival order. Once the
+        # responder stops (the client went away) nothing drains answers, so reading stops
+        # too and the answers still queued are cancelled
+        answers = asyncio.Queue(maxsize=self.max_pipeline)
+        responder = asyncio.create_task(self.respond(answers, writer))
+        try:
+            while True:
+                read = await self.unless_done(reader.readline(), responder)
+                if read is None or not read.result():
+                    break
+                text = read.result().decode("ascii", "replace").strip()
+                if text:
+                    answer = asyncio.ensure_future(self.answer(text))
+                    if await self.unless_done(answers.put(answer), responder) is None:  # Waits while the pipeline is full
+                        answer.cancel()
+                        break
+        except ConnectionError:
+            pass
+        finally:
+            if not responder.done():
+                await self.unless_done(answers.put(None), responder)
+            await responder
+            while not answers.empty():
+                answer = answers.get_nowait()
+                if answer is not None:
+                    answer.cancel()
+
+    async def unless_done(self, awaitable, responder):
+        # The finished task running awaitable, or None if the responder finished first, in
+        # which case awaitable is cancelled
+        task = asyncio.ensure_future(awaitable)
+        await asyncio.wait((task, responder), return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            task.cancel()
+            return None
+        return task
+
+    async def respond(self, answers, writer):
+        try:
+            while True:
+                answer = await answers.get()
+                if answer is None:
+                    break
+                writer.write((await answer).encode("ascii") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def answer(self, text):
+        fields = text.split()
+        if fields[0] == "stats":
+            return json.dumps(self.as_dict())
+        self.requests += 1
+        puzzle = fields[0].replace(".", "0")
+        try:
+            deadline = min(float(fields[1]), self.deadline) if len(fields) > 1 else self.deadline
+        except ValueError:
+            return ERROR
+        if len(puzzle) not in sudoku_io.PUZZLE_LENGTHS:
+            return INVALID
+
+        shared = self.inflight.get(puzzle)
+        if shared is None or shared[1] < deadline:
+            if shared is None and len(self.inflight) >= self.queue_size:
+                self.rejected += 1
+                return BUSY
+            # The worker gives up at this request's deadline, so it is not held for longer
+            # than anyone waits for the answer
+            self.solves += 1
+            future = asyncio.get_running_loop().run_in_executor(self.pool, solve_line, puzzle, dict(self.options, timeout=deadline))
+            self.inflight[puzzle] = (future, deadline)
+            future.add_done_callback(lambda done: self.forget(puzzle, done))
+        else:
+            future = shared[0]
+            self.coalesced += 1
+        try:
+            # shield keeps one waiter's deadline from cancelling the solve the others share
+            return await asyncio.wait_for(asyncio.shield(future), deadline)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return TIMEOUT
+        except Exception:
+            self.errors += 1
+            return ERROR
+
+    def forget(self, puzzle, future):
+        # Drop a finished solve, unless a longer one has replaced it
+        if self.inflight.get(puzzle, (None,))[0] is future:
+            del self.inflight[puzzle]
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "solves": self.solves,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "inflight": len(self.inflight),
+        }
+
+
+async def serve(args):
+    server = SolveServer(
+        args.workers,
+        args.queue_size,
+        args.deadline,
+        args.max_pipeline,
+        backend=args.backend,
+        var_order=args.var_order,
+        value_order=args.value_order,
+        propagation=args.propagation,
+    )
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving on {where}", file=sys.stderr)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Sudoku solves over TCP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="solver processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=1024, help="distinct puzzles in flight before answering busy")
+    parser.add_argument("--deadline", type=float, default=5.0, help="seconds a request may take at most")
+    parser.add_argument("--max-pipeline", type=int, default=64, help="unanswered puzzles per connection before reading pauses")
+    parser.add_argument("--backend", default="backtrack", choices=BACKENDS)
+    parser.add_argument("--var-order", default="mrv", choices=list(VARIABLE_ORDERINGS))
+    parser.add_argument("--value-order", default="ascending", choices=list(VALUE_ORDERINGS))
+    parser.add_argument("--propagation", default="full", choices=list(PROPAGATION_LEVELS))
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
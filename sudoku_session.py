@@ -0,0 +1,126 @@
+from sudoku_core import VALUE_CHARS, SudokuSolver, geometry, mask_to_values, puzzle_box, puzzle_string
+
+# State of one interactive game, kept for its whole lifetime so a move never costs a solve.
+# The puzzle is solved once when the session starts; after that the row, column and box
+# bitmasks answer "does this digit clash?" with one lookup, and comparing against the
+# cached solution answers "can this still be completed?". Only puzzles with more than one
+# solution fall back to a search, and only for a digit that differs from the cached
+# solution. Nothing here imports tkinter, so a server can hold many sessions at once.
+
+MOVE_ACCEPTED = 0
+MOVE_CONFLICT = 1  # The digit is already in the cell's row, column or box
+MOVE_WRONG = 2  # No clash, but no solution has this digit in this cell
+MOVE_GIVEN = 3  # The cell holds one of the puzzle's clues
+
+
+class PuzzleSession:
+    def __init__(self, puzzle, box=None):
+        # puzzle is a nested list or a one-line string; ValueError if it is invalid or has
+        # no solution
+        text = puzzle if isinstance(puzzle, str) else puzzle_string(puzzle)
+        self.geo = geometry(box or puzzle_box(puzzle))
+        self.size = self.geo.side
+        solver = SudokuSolver(text, verbose=False, trace="off", box=self.geo.box)
+        if not solver.is_valid():
+            raise ValueError("Invalid Sudoku puzzle")
+        self.grid = solver.grid[:]  # Clues and accepted entries, cell index = row * size + col
+        self.row_masks = solver.row_masks[:]
+        self.col_masks = solver.col_masks[:]
+        self.box_masks = solver.box_masks[:]
+        self.givens = frozenset(cell for cell, num in enumerate(self.grid) if num)
+        self.filled = len(self.givens)
+        solution, _ = solver.solve()
+        if not solution:
+            raise ValueError("Sudoku puzzle has no solution")
+        self.solution = solver.grid[:]  # A completion of the current grid
+        self.unique = SudokuSolver(text, backend="dlx", verbose=False, trace="off", box=self.geo.box).is_unique()
+
+    def place(self, row, col, num):
+        # Enter num in an empty or user-filled cell; returns a MOVE_* code and changes
+        # nothing unless the move is accepted
+        cell = row * self.size + col
+        if cell in self.givens:
+            return MOVE_GIVEN
+        current = self.grid[cell]
+        if num == current:
+            return MOVE_ACCEPTED
+        if self.used_mask(cell) & (1 << (num - 1)):
+            return MOVE_CONFLICT
+        if num != self.solution[cell]:
+            if self.unique:
+                return MOVE_WRONG
+            # Another solution may still fit: search once from the grid with this move made
+            trial = self.grid[:]
+            trial[cell] = num
+            solver = SudokuSolver("".join(VALUE_CHARS[value] for value in trial), verbose=False, trace="off", box=self.geo.box)
+            if not solver.solve()[0]:
+                return MOVE_WRONG
+            self.solution = solver.grid[:]
+        if current:
+            self.unset(cell, current)
+        self.set(cell, num)
+        return MOVE_ACCEPTED
+
+    def clear(self, row, col):
+        # Empty a user-filled cell; clues stay
+        cell = row * self.size + col
+        if cell not in self.givens and self.grid[cell]:
+            self.unset(cell, self.grid[cell])
+
+    def set(self, cell, num):
+        geo = self.geo
+        bit = 1 << (num - 1)
+        self.row_masks[geo.cell_row[cell]] |= bit
+        self.col_masks[geo.cell_col[cell]] |= bit
+        self.box_masks[geo.cell_box[cell]] |= bit
+        self.grid[cell] = num
+        self.filled += 1
+
+    def unset(self, cell, num):
+        geo = self.geo
+        bit = ~(1 << (num - 1))
+        self.row_masks[geo.cell_row[cell]] &= bit
+        self.col_masks[geo.cell_col[cell]] &= bit
+        self.box_masks[geo.cell_box[cell]] &= bit
+        self.grid[cell] = 0
+        self.filled -= 1
+
+    def used_mask(self, cell):
+        geo = self.geo
+        return self.row_masks[geo.cell_row[cell]] | self.col_masks[geo.cell_col[cell]] | self.box_masks[geo.cell_box[cell]]
+
+    def conflicts(self, row, col, num):
+        # (row, col) of the peers that already hold num, for highlighting a rejected entry
+        cell = row * self.size + col
+        if not self.used_mask(cell) & (1 << (num - 1)):
+            return []
+        return [divmod(peer, self.size) for peer in self.geo.peers[cell] if self.grid[peer] == num]
+
+    def candidates(self, row, col):
+        # Digits that do not clash in an empty cell
+        cell = row * self.size + col
+        if self.grid[cell]:
+            return []
+        return mask_to_values(self.geo.full_mask & ~self.used_mask(cell))
+
+    def hint(self, row=None, col=None):
+        # (row, col, num) from the cached solution: for the given cell, or else for the empty
+        # cell with the fewest candidates, the easiest one to work out by hand. None once the
+        # grid is full
+        if row is not None:
+            return row, col, self.solution[row * self.size + col]
+        empty = [cell for cell, num in enumerate(self.grid) if not num]
+        if not empty:
+            return None
+        cell = max(empty, key=lambda cell: self.used_mask(cell).bit_count())
+        return cell // self.size, cell % self.size, self.solution[cell]
+
+    def is_complete(self):
+        # Every cell filled; accepted entries never clash, so a full grid is solved
+        return self.filled == self.geo.cells
+
+    def puzzle(self):
+        # Current grid as a nested list
+        size = self.size
+        return [self.grid[row * size:row * size + size] for row in range(size)]
+
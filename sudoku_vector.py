@@ -0,0 +1,155 @@
+from sudoku_core import CHAR_VALUES, VALUE_CHARS
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy, batch.py keeps solving puzzles one by one
+    np = None
+
+# Whole-batch intake with NumPy. A chunk of N one-line puzzles becomes one (N, side, side)
+# uint8 array, and validation, candidate computation and singles propagation run as array
+# reductions over every row, column and box of every puzzle at once, with no per-cell Python
+# loops. Puzzles the singles finish (and solution dumps, which are already full) never reach
+# SudokuSolver; batch.solve_chunk() only hands the ones left open to the per-puzzle search.
+#
+# Digit planes are indexed [puzzle, row, col, digit - 1]; unit counts [puzzle, unit, digit - 1]
+# with boxes numbered band * box + stack, as in Geometry.
+
+GRID_OPEN = 0  # Valid, but singles alone do not finish it
+GRID_SOLVED = 1
+GRID_UNSOLVABLE = 2  # Valid, but the forced singles run into a contradiction
+GRID_INVALID = 3  # Bad length or character, or a digit repeated in a unit
+BOX_OF_LENGTH = {box ** 4: box for box in (3, 4, 5)}  # 81 -> 3, 256 -> 4, 625 -> 5
+
+if np is not None:
+    CHAR_CODES = np.full(256, 255, dtype=np.uint8)  # ASCII code -> cell value, 255 if not a cell
+    for char, value in CHAR_VALUES.items():
+        CHAR_CODES[ord(char)] = value
+    VALUE_CODES = np.frombuffer(VALUE_CHARS.encode("ascii"), dtype=np.uint8)  # Cell value -> ASCII code
+
+
+def box_map(box):
+    # (side, side) box index of every cell
+    index = np.arange(box * box) // box
+    return index[:, None] * box + index[None, :]
+
+
+def load_grids(lines, box=3):
+    # (grids, bad): an (N, side, side) uint8 array of the puzzles and a bool array marking
+    # lines of the wrong length or with characters that are not cells of this size. Bad
+    # lines are loaded as empty grids
+    side = box * box
+    cells = side * side
+    bad = np.array([len(line) != cells for line in lines], dtype=bool)
+    text = "".join(line if len(line) == cells else "0" * cells for line in lines)
+    grids = CHAR_CODES[np.frombuffer(text.encode("ascii", "replace"), dtype=np.uint8)].reshape(len(lines), side, side)
+    bad |= (grids > side).any(axis=(1, 2))
+    grids[bad] = 0
+    return grids, bad
+
+
+def unit_counts(grids, box=3):
+    # (rows, cols, boxes): how often every digit appears in every unit of every puzzle
+    side = box * box
+    present = grids[..., None] == np.arange(1, side + 1, dtype=np.uint8)
+    rows = present.sum(axis=2, dtype=np.uint8)
+    cols = present.sum(axis=1, dtype=np.uint8)
+    boxes = present.reshape(len(grids), box, box, box, box, side).sum(axis=(2, 4), dtype=np.uint8)
+    return rows, cols, boxes.reshape(len(grids), side, side)
+
+
+def validate(grids, box=3):
+    # Bool array, True where no digit repeats in a row, column or box
+    rows, cols, boxes = unit_counts(grids, box)
+    return ~((rows > 1).any(axis=(1, 2)) | (cols > 1).any(axis=(1, 2)) | (boxes > 1).any(axis=(1, 2)))
+
+
+def candidate_digits(grids, counts, box=3):
+    # (N, side, side, side) bool planes: digit d is still possible in an empty cell when its
+    # row, column and box do not hold it yet. Filled cells have no candidates
+    rows, cols, boxes = counts
+    used = (rows > 0)[:, :, None, :] | (cols > 0)[:, None, :, :] | (boxes > 0)[:, box_map(box)]
+    return (grids == 0)[..., None] & ~used
+
+
+def candidates(grids, box=3):
+    # (N, side, side) uint32 candidate bitmasks, bit 0 is digit 1 as in SudokuSolver; 0 for
+    # filled cells
+    digits = candidate_digits(grids, unit_counts(grids, box), box)
+    return digits.astype(np.uint32) @ (np.uint32(1) << np.arange(box * box, dtype=np.uint32))
+
+
+def propagate_singles(grids, box=3):
+    # Fill naked and hidden singles in every puzzle until none is left. Returns the filled
+    # copy of grids and a GRID_* state per puzzle. Each round only looks at the puzzles the
+    # previous round placed something in
+    side = box * box
+    grids = grids.copy()
+    state = np.full(len(grids), GRID_OPEN, dtype=np.uint8)
+    boxes_of = box_map(box)
+    live = np.arange(len(grids))
+    first = True
+    while len(live):
+        sub = grids[live]
+        counts = unit_counts(sub, box)
+        rows, cols, boxes = counts
+        clash = (rows > 1).any(axis=(1, 2)) | (cols > 1).any(axis=(1, 2)) | (boxes > 1).any(axis=(1, 2))
+        # A repeat in the given clues makes the puzzle invalid; one created by two forced
+        # singles means it has no solution
+        state[live[clash]] = GRID_INVALID if first else GRID_UNSOLVABLE
+        first = False
+
+        digits = candidate_digits(sub, counts, box)
+        empty = sub == 0
+        row_places = digits.sum(axis=2, dtype=np.uint8)
+        col_places = digits.sum(axis=1, dtype=np.uint8)
+        box_places = digits.reshape(len(sub), box, box, box, box, side).sum(axis=(2, 4), dtype=np.uint8).reshape(len(sub), side, side)
+        # Dead ends: an empty cell without candidates, or a missing digit with nowhere to go
+        stuck = (empty & ~digits.any(axis=3)).any(axis=(1, 2))
+        for places, held in ((row_places, rows), (col_places, cols), (box_places, boxes)):
+            stuck |= ((places == 0) & (held == 0)).any(axis=(1, 2))
+
+        naked = digits & (digits.sum(axis=3) == 1)[..., None]
+        hidden = digits & (
+            (row_places == 1)[:, :, None, :] | (col_places == 1)[:, None, :, :] | (box_places == 1)[:, boxes_of]
+        )
+        forced = naked | hidden
+        stuck |= (forced.sum(axis=3) > 1).any(axis=(1, 2))  # One cell forced to two digits
+        dead = ~clash & stuck
+        state[live[dead]] = GRID_UNSOLVABLE
+
+        done = ~clash & ~dead & ~empty.any(axis=(1, 2))
+        state[live[done]] = GRID_SOLVED
+        moved = forced.any(axis=3)
+        going = ~clash & ~dead & ~done & moved.any(axis=(1, 2))
+        sub = sub[going]
+        sub += np.where(moved[going], forced[going].argmax(axis=3) + 1, 0).astype(np.uint8)
+        live = live[going]
+        grids[live] = sub
+    return grids, state
+
+
+def grid_strings(grids):
+    # One-line strings of an (N, side, side) array
+    cells = grids.shape[1] * grids.shape[2]
+    text = VALUE_CODES[grids].tobytes().decode("ascii")
+    return [text[start:start + cells] for start in range(0, len(text), cells)]
+
+
+def presolve(lines):
+    # (state, solution) of every one-line puzzle, with solution set for GRID_SOLVED. Lines of
+    # any of the three sizes may be mixed; each size is handled as one array
+    results = [(GRID_INVALID, None)] * len(lines)
+    by_box = {}
+    for index, line in enumerate(lines):
+        if len(line) in BOX_OF_LENGTH:
+            by_box.setdefault(BOX_OF_LENGTH[len(line)], []).append(index)
+    for box, indexes in by_box.items():
+        grids, bad = load_grids([lines[index] for index in indexes], box)
+        grids, state = propagate_singles(grids, box)
+        state[bad] = GRID_INVALID
+        solved = state == GRID_SOLVED
+        solutions = iter(grid_strings(grids[solved]))
+        for index, code, finished in zip(indexes, state.tolist(), solved.tolist()):
+            results[index] = (code, next(solutions) if finished else None)
+    return results
+
@@ -0,0 +1,289 @@
+import asyncio
+import gc
+import os
+import random
+import time
+
+import pytest
+
+import batch
+import dlx
+import sudoku_cache
+import sudoku_core
+import sudoku_corpus
+import sudoku_io
+import sudoku_server
+from sudoku_core import SudokuSolver
+
+# Regression checks, run with `python -m pytest -q` from the repository root.
+
+HARDEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_data", "hardest.txt")
+
+
+def hardest():
+    with open(HARDEST_PATH) as stream:
+        return list(sudoku_io.read_lines(stream))
+
+
+def solver(puzzle, **options):
+    return SudokuSolver(puzzle, verbose=False, trace="off", **options)
+
+
+def test_corpus_closes_after_solving_a_record(tmp_path):
+    puzzles = hardest()
+    path = str(tmp_path / "hardest.sdkb")
+    assert sudoku_corpus.write_corpus(path, puzzles) == len(puzzles)
+    expected = solver(puzzles[3]).solve()[0]
+    gc.disable()  # The solver must not keep the mapping exported until a collection runs
+    try:
+        with sudoku_corpus.Corpus(path) as corpus:
+            assert solver(corpus.record(3)).solve()[0] == expected
+    finally:
+        gc.enable()
+
+
+def flat(puzzle):
+    return [sudoku_core.CHAR_VALUES[char] for char in puzzle]
+
+
+def open_puzzle():
+    # A 9x9 puzzle with several solutions: a fixed random grid with half its cells emptied
+    rng = random.Random(7)
+    grid = sudoku_core.random_solution(rng)
+    for cell in rng.sample(range(81), 55):
+        grid[cell // 9][cell % 9] = 0
+    return sudoku_core.puzzle_string(grid)
+
+
+CONFIGURATIONS = [
+    {"backend": "dlx"},
+    {"search": "recursive"},
+    {"search": "iterative"},
+    {"search": "iterative", "var_order": "mrv-degree", "value_order": "lcv", "propagation": "singles"},
+    {"search": "recursive", "propagation": "none"},
+]
+
+
+@pytest.mark.parametrize("options", CONFIGURATIONS, ids=lambda options: "/".join(options.values()))
+def test_configurations_agree_with_dlx_on_hardest(options):
+    for puzzle in hardest():
+        grid = flat(puzzle)
+        assert dlx.count_grid(grid[:], 2) == 1  # Every entry is unique, so there is one answer to agree on
+        expected = grid[:]
+        assert dlx.solve_grid(expected)
+        solution, _ = solver(puzzle, **options).solve()
+        assert flat(solution) == expected
+        assert solver(puzzle, **options).count_solutions(2) == 1
+
+
+@pytest.mark.parametrize("backend", sudoku_core.BACKENDS)
+def test_count_limits(backend):
+    puzzle = open_puzzle()
+    total = dlx.count_grid(flat(puzzle))
+    assert total > 2
+    assert solver(puzzle, backend=backend).count_solutions() == total
+    for limit in (0, 1, 2, total, total + 1):
+        assert solver(puzzle, backend=backend).count_solutions(limit) == min(limit, total)
+    assert solver("." * 81, backend=backend).count_solutions(0) == 0
+    assert solver("." * 81, backend=backend).count_solutions(3) == 3
+    assert not solver(puzzle, backend=backend).is_unique()
+    assert solver(hardest()[0], backend=backend).is_unique()
+    assert solver("11" + "." * 79, backend=backend).count_solutions(2) == 0  # Invalid givens
+
+
+def test_count_paused_is_incomplete():
+    counter = solver(hardest()[0], propagation="none", hooks={"node": lambda depth, cell: counter.pause()})
+    assert counter.count_solutions(2) is None
+
+
+def test_batch_keeps_cache_file_when_nothing_is_solved(tmp_path, monkeypatch):
+    monkeypatch.setattr(sudoku_cache, "_process_cache", None)
+    path = str(tmp_path / "cache.csv")
+    cache = sudoku_cache.SolutionCache()
+    for puzzle in hardest()[:5]:
+        cache.solve(puzzle, verbose=False, trace="off")
+    cache.save(path)
+    empty = tmp_path / "empty.txt"
+    empty.write_text("")
+    batch.main([str(empty), "-w", "1", "--cache-file", path, "-o", str(tmp_path / "out.txt")])
+    assert len(sudoku_cache.SolutionCache(path=path)) == 5
+
+
+SLOW_OPTIONS = {"var_order": "row-major", "propagation": "none"}  # hardest()[11] takes well over 10 s like this
+
+
+def handlers():
+    return [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == "SolveServer.handle"]
+
+
+async def start_server(**options):
+    server = sudoku_server.SolveServer(**options)
+    listener = await server.start(port=0)
+    # Start the workers now: ones forked later would inherit the test's client sockets
+    await asyncio.get_running_loop().run_in_executor(server.pool, int)
+    return server, listener, listener.sockets[0].getsockname()[1]
+
+
+def test_server_handler_exits_when_client_drops_mid_pipeline():
+    async def scenario():
+        server, listener, port = await start_server(workers=1, deadline=0.5, max_pipeline=2, **SLOW_OPTIONS)
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write("".join(f"{puzzle}\n" for puzzle in hardest()[:8]).encode("ascii"))
+            await writer.drain()
+            await asyncio.sleep(0.2)  # Let the server fill the pipeline and stop reading
+            writer.transport.abort()
+            for _ in range(50):
+                if not handlers():
+                    break
+                await asyncio.sleep(0.1)
+            assert not handlers()
+        finally:
+            listener.close()
+            server.close()
+
+    asyncio.run(scenario())
+
+
+async def exchange(port, lines):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("".join(f"{line}\n" for line in lines).encode("ascii"))
+    answers = [(await reader.readline()).decode("ascii").strip() for _ in lines]
+    writer.close()
+    await writer.wait_closed()
+    return answers
+
+
+def run_server(scenario, **options):
+    async def main():
+        server, listener, port = await start_server(**dict(SLOW_OPTIONS, **options))
+        try:
+            return await scenario(server, port)
+        finally:
+            listener.close()
+            server.close()
+
+    return asyncio.run(main())
+
+
+def test_server_coalesces_identical_puzzles():
+    puzzle = hardest()[3]
+    expected = solver(puzzle).solve()[0]
+
+    async def scenario(server, port):
+        assert await exchange(port, [puzzle] * 4 + ["not-a-puzzle"]) == [expected] * 4 + ["invalid"]
+        assert server.as_dict()["solves"] == 1
+        assert server.as_dict()["coalesced"] == 3
+        assert server.as_dict()["inflight"] == 0
+
+    run_server(scenario, workers=1)
+
+
+def test_server_answers_busy_when_queue_is_full():
+    slow, fast = hardest()[11], hardest()[7]
+
+    async def scenario(server, port):
+        assert await exchange(port, [f"{slow} 0.3", f"{fast} 0.3"]) == ["timeout", "busy"]
+        assert server.as_dict()["rejected"] == 1
+
+    run_server(scenario, workers=1, queue_size=1)
+
+
+def test_server_stops_reading_past_the_pipeline_limit():
+    slow, fast = hardest()[11], hardest()[7]
+    expected = solver(fast).solve()[0]
+
+    async def scenario(server, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"{slow} 0.5\n{fast}\n{fast}\n{fast}\n{fast}\n{fast}\n".encode("ascii"))
+        await asyncio.sleep(0.2)
+        # Two queued answers, one the responder waits on and one waiting for room
+        assert server.as_dict()["requests"] <= 4
+        answers = [(await reader.readline()).decode("ascii").strip() for _ in range(6)]
+        assert answers == ["timeout"] + [expected] * 5
+        writer.close()
+        await writer.wait_closed()
+
+    run_server(scenario, workers=1, max_pipeline=2)
+
+
+def test_server_frees_the_worker_at_the_request_deadline():
+    slow, fast = hardest()[11], hardest()[7]
+    expected = solver(fast).solve()[0]
+
+    async def scenario(server, port):
+        start = time.perf_counter()
+        assert await exchange(port, [f"{slow} 0.3", fast]) == ["timeout", expected]
+        # The only worker was free again soon after 0.3 s, not after the 30 s server deadline
+        assert time.perf_counter() - start < 5
+
+    run_server(scenario, workers=1, deadline=30.0)
+
+
+def test_proven_unique_never_passes_an_open_puzzle():
+    nested = lambda puzzle: [flat(puzzle)[row * 9:row * 9 + 9] for row in range(9)]
+    assert sudoku_core.proven_unique(nested(hardest()[0]))
+    assert not sudoku_core.proven_unique(nested(hardest()[0]), max_nodes=1)  # Cut short, so not proven
+    assert not sudoku_core.proven_unique(nested(open_puzzle()))
+    generated = sudoku_core.generate_unique_puzzle(2, random.Random(5))
+    assert dlx.count_solutions(generated, 2) == 1
+
+
+def test_dlx_counts_nodes_with_stats():
+    puzzle = hardest()[0]
+    counted = solver(puzzle, backend="dlx", stats=True)
+    assert counted.solve()[0]
+    limited = solver(puzzle, backend="dlx", stats=True)
+    assert limited.solve(max_nodes=10 ** 6)[0]
+    assert counted.stats.nodes == limited.stats.nodes > 0
+
+
+def transform(puzzle, rng):
+    # A symmetric variant: digits relabelled, bands, rows in bands, stacks and columns in
+    # stacks shuffled, and maybe transposed
+    digits = [0] + rng.sample(range(1, 10), 9)
+    rows = [band * 3 + row for band in rng.sample(range(3), 3) for row in rng.sample(range(3), 3)]
+    cols = [stack * 3 + col for stack in rng.sample(range(3), 3) for col in rng.sample(range(3), 3)]
+    grid = flat(puzzle)
+    cells = [grid[row * 9 + col] for row in rows for col in cols]
+    if rng.random() < 0.5:
+        cells = [cells[col * 9 + row] for row in range(9) for col in range(9)]
+    return "".join(str(digits[num]) for num in cells)
+
+
+def test_cache_answers_symmetric_variants():
+    rng = random.Random(3)
+    cache = sudoku_cache.SolutionCache()
+    for puzzle in hardest()[:5]:
+        cache.solve(puzzle, verbose=False, trace="off")
+        for _ in range(3):
+            variant = transform(puzzle, rng)
+            hits = cache.hits
+            solution, _ = cache.solve(variant, verbose=False, trace="off")
+            assert cache.hits == hits + 1
+            expected = flat(variant)
+            assert dlx.solve_grid(expected)
+            assert flat(solution) == expected  # The variant's own solution, not the cached one
+    assert cache.misses == 5
+
+
+def test_cache_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "cache.csv")
+    cache = sudoku_cache.SolutionCache(capacity=4)
+    for puzzle in hardest()[:6] + ["11" + "." * 79, "123456780" + "." * 8 + "9" + "." * 63]:
+        cache.solve(puzzle, verbose=False, trace="off")
+    cache.save(path)
+    loaded = sudoku_cache.SolutionCache(capacity=4, path=path)
+    assert list(loaded.entries.items()) == list(cache.entries.items())  # Same entries in LRU order
+    assert None in loaded.entries.values()  # The unsolvable puzzle is kept as such
+    solution, _ = loaded.solve(hardest()[5], verbose=False, trace="off")
+    assert loaded.hits == 1
+    assert solution == solver(hardest()[5]).solve()[0]
+
+
+def test_generate_zero_writes_nothing(tmp_path):
+    output = tmp_path / "puzzles.txt"
+    batch.main(["--generate", "0", "-o", str(output)])  # Must not fall through to reading stdin
+    assert output.read_text() == ""
+    with pytest.raises(SystemExit):
+        batch.main(["--generate", "-1"])